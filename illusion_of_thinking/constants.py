@@ -6,3 +6,10 @@ class SimulationType(Enum):
 
     TowerOfHanoi = auto()
     RiverCrossing = auto()
+
+
+# Simulation types by name, used to validate and resolve a requested simulator type
+SIMULATION_TYPES_BY_NAME = {t.name: t for t in SimulationType}
+INVALID_SIMULATION_TYPE_ERROR = (
+    f"Invalid simulator type. Must be one of {list(SIMULATION_TYPES_BY_NAME)}"
+)
@@ -5,20 +5,34 @@ This module implements an MCP server that provides a protocol for interacting
 with various simulator environments.
 """
 
+import asyncio
+import contextlib
+import inspect
 import logging
+import secrets
 import time
-import uuid
-from typing import Any, Dict, List, Optional, Union
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple, Union
 
+import orjson
 from fastmcp import FastMCP
+from fastmcp.utilities.types import get_cached_typeadapter
+from pydantic import ValidationError
 
-from illusion_of_thinking.constants import SimulationType
+from illusion_of_thinking.constants import (
+    INVALID_SIMULATION_TYPE_ERROR,
+    SIMULATION_TYPES_BY_NAME,
+    SimulationType,
+)
 from illusion_of_thinking.simulators import (
     RiverCrossingSimulator,
     TowerOfHanoiSimulator,
     create_simulator,
 )
 
+# Error returned by the tools for an unknown environment ID
+ENVIRONMENT_NOT_FOUND_ERROR = "Environment not found"
+
 # --- Configure Logging ---
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
@@ -27,12 +41,17 @@ logger = logging.getLogger(__name__)
 class SimulationEnvironment:
     """A simulation environment that holds a simulator instance and its metadata."""
 
+    # Avoid a per-instance __dict__, the server may hold many environments at once
+    __slots__ = ("simulator", "id", "last_accessed", "lock")
+
     def __init__(self, simulator_type: SimulationType, simulator_params: Dict[str, Any]):
         """Initialize a simulation environment with a specific simulator type and parameters."""
 
         self.simulator = create_simulator(simulator_type, simulator_params)
-        self.id = str(uuid.uuid4())
-        self.last_accessed = time.time()  # Add timestamp for tracking last access
+        self.id = secrets.token_urlsafe(12)  # 96 random bits, URL-safe
+        self.last_accessed = time.monotonic()  # Add timestamp for tracking last access
+        # Serializes state changes of this environment, other environments are not blocked
+        self.lock = asyncio.Lock()
 
     @property
     def simulator_type(self) -> str:
@@ -50,25 +69,34 @@ class SimulationManager:
 
     def __init__(self):
         """Initialize the simulation manager."""
-        self.environments: Dict[str, SimulationEnvironment] = {}
+        # Environments are kept in least-recently-accessed order, so expired
+        # environments can be popped from the front without a full scan.
+        self.environments: OrderedDict[str, SimulationEnvironment] = OrderedDict()
         self.inactive_threshold: int = 180  # Two minutes in seconds
+        self.cleanup_interval: int = 30  # Seconds between two cleanup runs
+        self.access_resolution: float = 1.0  # Minimum seconds between timestamp refreshes
+        self._cleanup_task: Optional[asyncio.Task] = None
+        self._num_sessions: int = 0  # Sessions which currently need the cleanup task
 
     def create_environment(
         self, simulator_type: SimulationType, simulator_params: Dict[str, Any]
     ) -> SimulationEnvironment:
         """Create a new simulation environment and register it."""
-        # Clean up inactive environments
-        self.cleanup_inactive_environments()
-
-        env = SimulationEnvironment(simulator_type, simulator_params)
-        self.environments[env.id] = env
-        return env
+        while True:
+            env = SimulationEnvironment(simulator_type, simulator_params)
+            # Never overwrite an existing environment in the unlikely case of an ID collision
+            if self.environments.setdefault(env.id, env) is env:
+                return env
 
     def get_environment(self, env_id: str) -> Optional[SimulationEnvironment]:
         """Get a simulation environment by ID and update its last accessed timestamp."""
         env = self.environments.get(env_id)
         if env:
-            env.last_accessed = time.time()  # Update timestamp when accessed
+            # Only refresh the timestamp (and access order) if it is noticeably outdated
+            now = time.monotonic()
+            if now - env.last_accessed >= self.access_resolution:
+                env.last_accessed = now
+                self.environments.move_to_end(env_id)
         return env
 
     def validate_environment(self, env_id: str) -> bool:
@@ -84,25 +112,71 @@ class SimulationManager:
 
     def cleanup_inactive_environments(self) -> None:
         """Remove environments that haven't been accessed for more than the inactive threshold."""
-        current_time = time.time()
-        inactive_envs = [
-            env_id
-            for env_id, env in self.environments.items()
-            if current_time - env.last_accessed > self.inactive_threshold
-        ]
-
-        for env_id in inactive_envs:
+        current_time = time.monotonic()
+        while self.environments:
+            env_id, env = next(iter(self.environments.items()))
+            if current_time - env.last_accessed <= self.inactive_threshold:
+                # All remaining environments were accessed more recently
+                break
             logger.info(f"Cleaning up inactive environment: {env_id}")
-            self.delete_environment(env_id)
+            self.environments.popitem(last=False)
+
+    def start_cleanup_task(self) -> None:
+        """
+        Start the periodic cleanup of inactive environments on the running event loop. Every
+        call must be paired with a call of aclose(), the task runs until the last one.
+        """
+        self._num_sessions += 1
+        if self._cleanup_task is None or self._cleanup_task.done():
+            self._cleanup_task = asyncio.get_running_loop().create_task(self._cleanup_loop())
+
+    async def _cleanup_loop(self) -> None:
+        """Clean up inactive environments every cleanup interval until cancelled."""
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            self.cleanup_inactive_environments()
+
+    async def aclose(self) -> None:
+        """Stop the periodic cleanup task once no session needs it anymore."""
+        self._num_sessions = max(self._num_sessions - 1, 0)
+        if self._num_sessions or self._cleanup_task is None:
+            return
+        self._cleanup_task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._cleanup_task
+        self._cleanup_task = None
 
 
-# Create a single global instance of the FastMCP server
-mcp = FastMCP(name="SimulationServer")
-
 # Create a global simulation manager
 simulation_manager = SimulationManager()
 
 
+@contextlib.asynccontextmanager
+async def lifespan(server: FastMCP) -> AsyncIterator[None]:
+    """
+    Run the periodic environment cleanup while the server has sessions. FastMCP enters the
+    lifespan once per session, e.g. once per request for the stateless HTTP transport.
+    """
+    simulation_manager.start_cleanup_task()
+    try:
+        yield
+    finally:
+        await simulation_manager.aclose()
+
+
+def serialize_tool_result(data: Any) -> str:
+    """Serialize a tool result to compact JSON using orjson."""
+    return orjson.dumps(data, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+# Create a single global instance of the FastMCP server
+mcp = FastMCP(
+    name="SimulationServer",
+    lifespan=lifespan,
+    tool_serializer=serialize_tool_result,
+)
+
+
 @mcp.tool
 def init_simulator(simulator_type: str, N: int, k: Optional[int] = None) -> Dict[str, Any]:
     """
@@ -116,10 +190,9 @@ def init_simulator(simulator_type: str, N: int, k: Optional[int] = None) -> Dict
     Returns:
         Dictionary containing environment ID, token, simulator type, and parameters
     """
-    if simulator_type not in [t.name for t in SimulationType]:
-        return {
-            "error": f"Invalid simulator type. Must be one of {[t.name for t in SimulationType]}"
-        }
+    simulator_type_enum = SIMULATION_TYPES_BY_NAME.get(simulator_type)
+    if simulator_type_enum is None:
+        return {"error": INVALID_SIMULATION_TYPE_ERROR}
 
     if N < 1:
         return {"error": "N must be at least 1"}
@@ -133,9 +206,7 @@ def init_simulator(simulator_type: str, N: int, k: Optional[int] = None) -> Dict
     if k is not None:
         simulator_params["k"] = k
 
-    environment = simulation_manager.create_environment(
-        SimulationType[simulator_type], simulator_params
-    )
+    environment = simulation_manager.create_environment(simulator_type_enum, simulator_params)
 
     return {
         "env_id": environment.id,
@@ -145,7 +216,9 @@ def init_simulator(simulator_type: str, N: int, k: Optional[int] = None) -> Dict
 
 
 @mcp.tool
-def execute_moves(env_id: str, moves: Union[List[List[int]], List[List[str]]]) -> Dict[str, Any]:
+async def execute_moves(
+    env_id: str, moves: Union[List[List[int]], List[List[str]]]
+) -> Dict[str, Any]:
     """
     Execute aa list of moves in the simulation.
 
@@ -158,35 +231,46 @@ def execute_moves(env_id: str, moves: Union[List[List[int]], List[List[str]]]) -
     Returns:
         Dictionary containing move success status, current state, and goal status
     """
-    # Validate environment
     environment = simulation_manager.get_environment(env_id)
     if environment is None:
-        return {"error": "Environment not found"}
+        return {"error": ENVIRONMENT_NOT_FOUND_ERROR}
 
     simulator = environment.simulator
 
-    move_results = []
-    for i, move in enumerate(moves):
-        # Convert move to appropriate type if necessary
-        move_was_successful = simulator.execute_move(move)
-        move_results.append({"move_index": i, "move": move, "successful": move_was_successful})
+    if not moves:
+        # Nothing to execute, report the current state without taking the lock
+        state, goal_reached = simulator.snapshot()
+        return {
+            "move_results": [],
+            "final_state": state,
+            "goal_reached": goal_reached,
+            "all_moves_successful": True,
+        }
 
-        if not move_was_successful:
-            break
+    async with environment.lock:
+        num_successful = simulator.execute_moves_batch(moves)
+        state, goal_reached = simulator.snapshot()
 
-    state = simulator.state
-    goal_reached = simulator.is_goal_reached()
+    move_results = [
+        {"move_index": i, "move": moves[i], "successful": True} for i in range(num_successful)
+    ]
+    # Execution stops at the first failing move
+    all_moves_successful = num_successful == len(moves)
+    if not all_moves_successful:
+        move_results.append(
+            {"move_index": num_successful, "move": moves[num_successful], "successful": False}
+        )
 
     return {
         "move_results": move_results,
         "final_state": state,
         "goal_reached": goal_reached,
-        "all_moves_successful": all(result["successful"] for result in move_results),
+        "all_moves_successful": all_moves_successful,
     }
 
 
 @mcp.tool
-def reset_simulator(
+async def reset_simulator(
     env_id: str,
     state: Union[List[List[int]], List[Union[int, Dict[str, int]]], str, None] = None,
 ) -> Dict[str, Any]:
@@ -204,22 +288,22 @@ def reset_simulator(
     Returns:
         Dictionary indicating reset success and current state
     """
-    # Validate environment
     environment = simulation_manager.get_environment(env_id)
     if environment is None:
-        return {"error": "Environment not found"}
+        return {"error": ENVIRONMENT_NOT_FOUND_ERROR}
 
-    try:
-        # Check if state is "default" or None, in which case we reset to default state
-        if state is None or state == "default":
-            environment.simulator.reset()
-        else:
-            # Let the simulator handle validation by attempting to reset with the provided state
-            environment.simulator.reset(state)
+    async with environment.lock:
+        try:
+            # Check if state is "default" or None, in which case we reset to default state
+            if state is None or state == "default":
+                environment.simulator.reset()
+            else:
+                # Let the simulator validate the provided state while resetting
+                environment.simulator.reset(state)
 
-        return {"reset_successful": True, "current_state": environment.simulator.state}
-    except ValueError as e:
-        return {"error": str(e), "reset_successful": False}
+            return {"reset_successful": True, "current_state": environment.simulator.state}
+        except ValueError as e:
+            return {"error": str(e), "reset_successful": False}
 
 
 @mcp.tool
@@ -233,18 +317,85 @@ def get_state(env_id: str) -> Dict[str, Any]:
     Returns:
         Dictionary containing simulator type, parameters, current state, and goal status
     """
-    # Validate environment ID
     environment = simulation_manager.get_environment(env_id)
     if environment is None:
-        return {"error": "Environment not found"}
+        return {"error": ENVIRONMENT_NOT_FOUND_ERROR}
 
+    state, goal_reached = environment.simulator.snapshot()
     return {
         "simulator_type": environment.simulator_type.name,
         "simulator_params": environment.simulator_params,
-        "state": environment.simulator.state,
-        "goal_reached": environment.simulator.is_goal_reached(),
+        "state": state,
+        "goal_reached": goal_reached,
     }
 
 
+# Tools which can be called as operations of a batch. Like for a direct call of a tool, the
+# arguments of an operation are validated and coerced against the signature of the tool.
+BATCH_TOOLS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    tool.name: get_cached_typeadapter(tool.fn).validate_python
+    for tool in (init_simulator, execute_moves, reset_simulator, get_state)
+}
+
+
+async def _run_batch_operation(operation: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a single operation of a batch and return the result of the called tool."""
+    try:
+        tool_name = operation.get("tool")
+        run_tool = BATCH_TOOLS.get(tool_name) if isinstance(tool_name, str) else None
+        if run_tool is None:
+            return {"error": f"Invalid tool. Must be one of {list(BATCH_TOOLS)}"}
+
+        result = run_tool(operation.get("args", {}))
+        if inspect.isawaitable(result):
+            result = await result
+        return result
+    except ValidationError as e:
+        return {"error": f"Invalid arguments: {e}"}
+    except Exception as e:
+        # A failing operation must not fail the other operations of the batch
+        logger.exception(f"Batch operation failed: {operation}")
+        return {"error": f"Operation failed: {e}"}
+
+
+@mcp.tool
+async def batch_execute(
+    ops: List[Dict[str, Any]], max_concurrent: int = 8, stop_on_error: bool = False
+) -> Dict[str, Any]:
+    """
+    Execute a batch of tool calls with a single request.
+
+    Args:
+        ops: List of operations, each given as {"tool": tool_name, "args": {...}} where
+             tool_name is one of init_simulator, execute_moves, reset_simulator or get_state
+        max_concurrent: Maximum number of operations that are run concurrently
+        stop_on_error: If True, run the operations in order and stop at the first operation
+                       that returns an error
+
+    Returns:
+        Dictionary containing the results of the executed operations in the order of ops
+    """
+    if max_concurrent < 1:
+        return {"error": "max_concurrent must be at least 1"}
+
+    if stop_on_error:
+        results = []
+        for operation in ops:
+            result = await _run_batch_operation(operation)
+            results.append(result)
+            if "error" in result:
+                break
+        return {"results": results}
+
+    semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def run_limited(operation: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            return await _run_batch_operation(operation)
+
+    results = await asyncio.gather(*(run_limited(operation) for operation in ops))
+    return {"results": list(results)}
+
+
 if __name__ == "__main__":
     mcp.run()  # Use the default stdio transport
@@ -1,9 +1,13 @@
 import argparse
-import importlib
+import copy
+import functools
+import importlib.resources
 import os
 import pathlib
 from typing import Dict
 
+import httpx
+import litellm
 import yaml
 from smolagents import (
     EMPTY_PROMPT_TEMPLATES,
@@ -17,6 +21,23 @@ from smolagents import (
 from illusion_of_thinking.constants import SimulationType
 from illusion_of_thinking.simulator_tools import get_tools
 
+# Private copy of the smolagents defaults, so merging prompts never modifies the shared global
+_BASE_PROMPT_TEMPLATES = copy.deepcopy(EMPTY_PROMPT_TEMPLATES)
+
+# Use the C implementation of the YAML loader if PyYAML was built with it
+_YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+# Raw prompt templates for every simulator type, read once at import
+_PROMPT_TEMPLATES: Dict[SimulationType, Dict[str, str]] = {
+    simulator_type: yaml.load(
+        importlib.resources.files("illusion_of_thinking.prompts")
+        .joinpath(f"{simulator_type.name}_original.yaml")
+        .read_text(),
+        Loader=_YamlLoader,
+    )
+    for simulator_type in SimulationType
+}
+
 
 def get_prompt_templates(simulator_type: SimulationType, **kwargs) -> Dict[str, str]:
     """
@@ -32,17 +53,27 @@ def get_prompt_templates(simulator_type: SimulationType, **kwargs) -> Dict[str,
     Returns:
         dict: Dictionary containing formatted user and system prompts
     """
-    # Get the appropriate templates
-    prompt_templates = yaml.safe_load(
-        importlib.resources.files("illusion_of_thinking.prompts")
-        .joinpath(f"{simulator_type.name}_original.yaml")
-        .read_text()
-    )
+    # Return a copy, so callers cannot modify the cached templates
+    return dict(_format_prompt_templates(simulator_type, **kwargs))
+
+
+@functools.lru_cache(maxsize=128)
+def _format_prompt_templates(simulator_type: SimulationType, **kwargs) -> Dict[str, str]:
+    """Format the prompt templates once per simulator type and parameters."""
+    return {k: v.format(**kwargs) for k, v in _PROMPT_TEMPLATES[simulator_type].items()}
 
-    for k, v in prompt_templates.items():
-        prompt_templates[k] = v.format(**kwargs)
 
-    return prompt_templates
+def configure_http_client() -> None:
+    """
+    Share one pooled HTTP client between all LiteLLM requests of this process, so
+    consecutive experiment runs reuse open connections instead of repeating the
+    TCP and TLS handshakes.
+    """
+    if litellm.client_session is None:
+        litellm.client_session = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=50),
+            timeout=600,
+        )
 
 
 def configure_agent(
@@ -79,14 +110,13 @@ def configure_agent(
     else:
         model_id = "mistral/mistral-medium-2505"
 
+    configure_http_client()
     model = LiteLLMModel(
         model_id=model_id, temperature=1.0, max_tokens=40000, api_key=os.getenv("MISTRAL_API_KEY")
     )
 
     if prompt_templates:
-        prompt_templates_tmp = EMPTY_PROMPT_TEMPLATES
-        prompt_templates_tmp.update(prompt_templates)
-        prompt_templates = prompt_templates_tmp
+        prompt_templates = {**_BASE_PROMPT_TEMPLATES, **prompt_templates}
 
     if use_tools:
         agent = ToolCallingAgent(
@@ -169,10 +199,10 @@ def main():
     )
 
     for i in range(10):
-        with open(out_path / f"experiment_{i + 1}.yaml", "w") as f:
-            print(f"Running experiment {i + 1}...")
-            response = agent.run(prompts["user_prompt"])
-            yaml.dump({"answer": response.to_string()}, f)
+        print(f"Running experiment {i + 1}...")
+        response = agent.run(prompts["user_prompt"])
+        # The answer is a single string, so it is written as plain text without YAML encoding
+        (out_path / f"experiment_{i + 1}.txt").write_text(response.to_string())
 
 
 if __name__ == "__main__":
@@ -6,27 +6,95 @@ following the Tool pattern. This simplified version assumes only one active
 simulator at a time.
 """
 
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Union
 
 from smolagents import Tool
 
-from .constants import SimulationType
+from .constants import INVALID_SIMULATION_TYPE_ERROR, SIMULATION_TYPES_BY_NAME, SimulationType
 from .simulators import Simulator, create_simulator
 
-# Global variable to store the current simulator
-current_simulator = None
+
+class _SimulatorSlot:
+    """Holder for the current active simulator instance."""
+
+    __slots__ = ("simulator",)
+
+    def __init__(self) -> None:
+        self.simulator: Optional[Simulator] = None
+
+
+# Global slot to store the current simulator, read directly by the tools
+_CURRENT = _SimulatorSlot()
+
+
+class GetStateResult(NamedTuple):
+    """Result of the get_state tool."""
+
+    simulator_type: str
+    simulator_params: Dict[str, Any]
+    state: Any
+    goal_reached: bool
+
+
+class ExecuteMovesResult(NamedTuple):
+    """Result of the execute_moves tool."""
+
+    move_results: List[Dict[str, Any]]
+    final_state: Any
+    goal_reached: bool
+    all_moves_successful: bool
+
+
+def get_state_result(simulator: Simulator) -> GetStateResult:
+    """Get the current state of a simulator as a GetStateResult."""
+    return GetStateResult(
+        simulator_type=simulator.type.name,
+        simulator_params=simulator.params,
+        state=simulator.state,
+        goal_reached=simulator.is_goal_reached(),
+    )
+
+
+def execute_moves_result(
+    simulator: Simulator, moves: Sequence[Any], return_move_results: bool = True
+) -> ExecuteMovesResult:
+    """
+    Execute moves in a simulator and collect the outcome as an ExecuteMovesResult.
+
+    The moves are run with Simulator.execute_moves_batch, which keeps no per-move data. If
+    return_move_results is False, the results of the successful moves are not materialized
+    either and move_results only contains the failing move, if any.
+    """
+    num_successful = simulator.execute_moves_batch(moves)
+    if return_move_results:
+        move_results = [
+            {"move_index": i, "move": moves[i], "successful": True} for i in range(num_successful)
+        ]
+    else:
+        move_results = []
+    # Execution stops at the first failing move
+    all_moves_successful = num_successful == len(moves)
+    if not all_moves_successful:
+        move_results.append(
+            {"move_index": num_successful, "move": moves[num_successful], "successful": False}
+        )
+
+    return ExecuteMovesResult(
+        move_results=move_results,
+        final_state=simulator.state,
+        goal_reached=simulator.is_goal_reached(),
+        all_moves_successful=all_moves_successful,
+    )
 
 
 def get_current_simulator() -> Optional[Simulator]:
     """Get the current active simulator instance."""
-    global current_simulator
-    return current_simulator
+    return _CURRENT.simulator
 
 
 def set_current_simulator(simulator: Optional[Simulator]) -> None:
     """Set the current active simulator instance."""
-    global current_simulator
-    current_simulator = simulator
+    _CURRENT.simulator = simulator
 
 
 class CreateSimulatorTool(Tool):
@@ -60,25 +128,20 @@ class CreateSimulatorTool(Tool):
     output_type = "object"
 
     def forward(self, simulator_type: str, N: int, k: Optional[int] = None) -> Dict[str, Any]:
-        f"""
+        """
         Initialize a simulator environment.
 
         Args:
-            simulator_type: Type of simulator to initialize ({SimulationType.TowerOfHanoi.name} or
-                            {SimulationType.RiverCrossing.name})
+            simulator_type: Type of simulator to initialize (TowerOfHanoi or RiverCrossing)
             N: Size parameter defining the scale of the simulation
-            k: For {SimulationType.RiverCrossing.name}, the maximum number of passengers the boat 
-               can carry
+            k: For RiverCrossing, the maximum number of passengers the boat can carry
 
         Returns:
             Dictionary containing simulator type and parameters
         """
-        if simulator_type not in [t.name for t in SimulationType]:
-            return {
-                "error": (f"Invalid simulator type. Must be in '{[t.name for t in SimulationType]}")
-            }
-
-        simulator_type = SimulationType[simulator_type]
+        simulator_type = SIMULATION_TYPES_BY_NAME.get(simulator_type)
+        if simulator_type is None:
+            return {"error": INVALID_SIMULATION_TYPE_ERROR}
 
         if N < 1:
             return {"error": "N must be at least 1"}
@@ -92,7 +155,7 @@ class CreateSimulatorTool(Tool):
 
         try:
             simulator = create_simulator(simulator_type, params)
-            set_current_simulator(simulator)
+            _CURRENT.simulator = simulator
             return {
                 "simulator_type": simulator.type.name,
                 "simulator_params": simulator.params,
@@ -136,7 +199,7 @@ class ResetSimulatorTool(Tool):
         Returns:
             Dictionary indicating reset success and current state
         """
-        simulator = get_current_simulator()
+        simulator = _CURRENT.simulator
 
         if simulator is None:
             return {"error": "No simulator has been initialized"}
@@ -170,17 +233,12 @@ class GetStateTool(Tool):
         Returns:
             Dictionary containing current state and goal status
         """
-        simulator = get_current_simulator()
+        simulator = _CURRENT.simulator
 
         if simulator is None:
             return {"error": "No simulator has been initialized"}
 
-        return {
-            "simulator_type": simulator.type.name,
-            "simulator_params": simulator.params,
-            "state": simulator.state,
-            "goal_reached": simulator.is_goal_reached(),
-        }
+        return get_state_result(simulator)._asdict()
 
 
 class ExecuteMovesTool(Tool):
@@ -198,41 +256,39 @@ class ExecuteMovesTool(Tool):
             - For {SimulationType.RiverCrossing.name}: [["A_1", "a_1"], ...]
             """,
         },
+        "return_move_results": {
+            "type": "boolean",
+            "description": """
+            Whether to return the result of every executed move (default: true).
+            Set to false for long move sequences if only the final state is needed,
+            then only the failing move is reported in move_results.
+            """,
+            "optional": True,
+            "nullable": True,
+        },
     }
     output_type = "object"
 
-    def forward(self, moves: List[Any]) -> Dict[str, Any]:
+    def forward(self, moves: List[Any], return_move_results: bool = True) -> Dict[str, Any]:
         """
         Execute multiple moves in sequence in the simulation.
 
         Args:
             moves: List of moves to execute in sequence
+            return_move_results: Whether to return the result of every executed move
 
         Returns:
             Dictionary containing results of each move, final state, and goal status
         """
-        simulator = get_current_simulator()
+        simulator = _CURRENT.simulator
 
         if simulator is None:
             return {"error": "No simulator has been initialized"}
 
-        move_results = []
-        for i, move in enumerate(moves):
-            move_was_successful = simulator.execute_move(move)
-            move_results.append({"move_index": i, "move": move, "successful": move_was_successful})
-
-            if not move_was_successful:
-                break
-
-        state = simulator.state
-        goal_reached = simulator.is_goal_reached()
-
-        return {
-            "move_results": move_results,
-            "final_state": state,
-            "goal_reached": goal_reached,
-            "all_moves_successful": all(result["successful"] for result in move_results),
-        }
+        # The result is only converted to a dict at the serialization boundary
+        if return_move_results is None:
+            return_move_results = True
+        return execute_moves_result(simulator, moves, return_move_results)._asdict()
 
 
 def get_tools() -> List[Tool]:
@@ -1,5 +1,7 @@
+import copy
+import functools
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 from .constants import SimulationType
 
@@ -21,7 +23,8 @@ class Simulator(ABC):
             N: Integer size parameter defining the scale of the simulation.
         """
         self.N = N
-        self.state = None
+        self._state_version = 0  # Incremented whenever the state changes
+        self._goal_cache: Optional[Tuple[int, bool]] = None  # (state version, goal reached)
         self.reset()
 
     @property
@@ -34,6 +37,23 @@ class Simulator(ABC):
         """
         return {"N": self.N}
 
+    @property
+    @abstractmethod
+    def state(self) -> Any:
+        """
+        Get the current state.
+
+        Returns:
+            The current state
+        """
+        pass
+
+    @state.setter
+    @abstractmethod
+    def state(self, state: Any) -> None:
+        """Set the current state without validating it, use reset() to validate it."""
+        pass
+
     @abstractmethod
     def execute_move(self, move: Any) -> bool:
         """
@@ -86,10 +106,64 @@ class Simulator(ABC):
         """
         pass
 
-    @abstractmethod
+    def execute_moves_batch(self, moves: Sequence[Any]) -> int:
+        """
+        Execute a sequence of moves in order, stopping at the first move that is not
+        successful.
+
+        Args:
+            moves: The moves to execute
+
+        Returns:
+            Number of moves executed successfully. If it is smaller than len(moves), the move
+            at this index failed and the remaining moves were not executed.
+        """
+        execute_move = self.execute_move
+        for i, move in enumerate(moves):
+            if not execute_move(move):
+                return i
+        return len(moves)
+
+    def clone(self) -> "Simulator":
+        """
+        Create an independent copy of this simulator in its current state. The copy shares
+        the immutable metadata of this simulator and is neither initialized nor validated
+        again.
+
+        Returns:
+            A simulator of the same type and parameters in the same state
+        """
+        return copy.copy(self)
+
+    def snapshot(self) -> Tuple[Any, bool]:
+        """
+        Get the current state together with the goal status in a single call.
+
+        Note: The state is built like the state property, so it can be modified without
+        changing the simulator.
+
+        Returns:
+            Tuple of the current state and whether the goal has been reached
+        """
+        return self.state, self.is_goal_reached()
+
     def is_goal_reached(self) -> bool:
         """
-        Check if the current state is a goal state.
+        Check if the current state is a goal state. The result is cached until the state
+        is changed by reset() or a successful execute_move().
+
+        Returns:
+            True if the goal has been reached, False otherwise
+        """
+        cache = self._goal_cache
+        if cache is None or cache[0] != self._state_version:
+            cache = self._goal_cache = (self._state_version, self._compute_goal_reached())
+        return cache[1]
+
+    @abstractmethod
+    def _compute_goal_reached(self) -> bool:
+        """
+        Check if the current state is a goal state without using the cached result.
 
         Returns:
             True if the goal has been reached, False otherwise
@@ -97,6 +171,40 @@ class Simulator(ABC):
         pass
 
 
+def _disks_from_mask(mask: int) -> List[int]:
+    """
+    Convert the bitmask of a Tower of Hanoi peg into its list of disks.
+
+    Args:
+        mask: Bitmask of the peg, bit k is set if disk k + 1 is on the peg
+
+    Returns:
+        The disks on the peg from bottom (largest) to top (smallest)
+    """
+    disks = []
+    while mask:
+        disk = mask.bit_length()
+        disks.append(disk)
+        mask ^= 1 << (disk - 1)
+    return disks
+
+
+def _is_int_move(move: Any) -> bool:
+    """
+    Check if a Tower of Hanoi move is a tuple or list of three integers.
+
+    Args:
+        move: The move to check
+
+    Returns:
+        True if the move is (disk_id, from_peg, to_peg) with integer values, False otherwise
+    """
+    if not (isinstance(move, (tuple, list)) and len(move) == 3):
+        return False
+    disk_id, from_peg, to_peg = move
+    return isinstance(disk_id, int) and isinstance(from_peg, int) and isinstance(to_peg, int)
+
+
 class TowerOfHanoiSimulator(Simulator):
     """
     A simulator for the Tower of Hanoi puzzle.
@@ -125,8 +233,61 @@ class TowerOfHanoiSimulator(Simulator):
     type = SimulationType.TowerOfHanoi
 
     def __init__(self, N: int):
+        # Each peg is a bitmask of its disks, bit k is set if disk k + 1 is on the peg.
+        # The state tuple is only built from the bitmasks when it is read. An assigned state
+        # which cannot be encoded as bitmasks is kept as given instead, with _pegs None.
+        self._pegs: Optional[List[int]] = [0, 0, 0]
+        self._invalid_state: Any = None
+        self._all_disks = (1 << N) - 1  # Bitmask of a peg holding every disk
+        # The disks of each peg are decoded once per state and kept immutable
+        self._state_cache: Optional[Tuple[int, Tuple[Tuple[int, ...], ...]]] = None
         super().__init__(N)
 
+    @property
+    def state(self) -> Tuple[List[int], List[int], List[int]]:
+        """
+        Get the current state as a tuple of the three pegs, each a list of disks from bottom
+        to top. Every read returns new lists, so callers may modify them.
+
+        Returns:
+            The current state
+        """
+        if self._pegs is None:
+            return copy.deepcopy(self._invalid_state)
+
+        cache = self._state_cache
+        if cache is None or cache[0] != self._state_version:
+            pegs = tuple(tuple(_disks_from_mask(mask)) for mask in self._pegs)
+            cache = self._state_cache = (self._state_version, pegs)
+        first, second, third = cache[1]
+        return list(first), list(second), list(third)
+
+    @state.setter
+    def state(
+        self, state: Optional[Union[Tuple[List[int], List[int], List[int]], List[List[int]]]]
+    ) -> None:
+        """
+        Set the current state without validating it, use reset() to validate it. An invalid
+        state is kept and reported by is_valid_state(), no moves can be executed from it.
+        """
+        if isinstance(state, list):
+            state = tuple(state)
+        self._pegs = self._pegs_from_state(state)
+        self._invalid_state = copy.deepcopy(state) if self._pegs is None else None
+        self._state_version += 1
+
+    def clone(self) -> "TowerOfHanoiSimulator":
+        """
+        Create an independent copy of this simulator in its current state.
+
+        Returns:
+            A simulator with the same number of disks in the same state
+        """
+        clone = super().clone()
+        if self._pegs is not None:
+            clone._pegs = list(self._pegs)
+        return clone
+
     def reset(
         self, state: Optional[Union[Tuple[List[int], List[int], List[int]], List[List[int]]]] = None
     ) -> None:
@@ -142,18 +303,58 @@ class TowerOfHanoiSimulator(Simulator):
             ValueError: If the provided state is not valid.
         """
         if state is not None:
-            old_state = self.state
             # Cast list to tuple if needed
             if isinstance(state, list):
                 state = tuple(state)
-            self.state = state
-            if not self.is_valid_state():
-                self.state = old_state
+            pegs = self._pegs_from_state(state)
+            if pegs is None:
                 raise ValueError("Provided state is not a valid Tower of Hanoi state.")
+            self._pegs = pegs
         else:
             # Create initial state with all disks on the first peg
-            # Order: largest disk (N) at bottom, smallest disk (1) at top
-            self.state = ([i for i in range(self.N, 0, -1)], [], [])
+            self._pegs = [self._all_disks, 0, 0]
+        self._invalid_state = None
+        self._state_version += 1
+
+    def _pegs_from_state(self, state: Any) -> Optional[List[int]]:
+        """
+        Convert a state given as a tuple of three lists of disks into peg bitmasks.
+
+        Args:
+            state: The state to convert
+
+        Returns:
+            The bitmasks of the three pegs, or None if the state is not valid
+        """
+        if not isinstance(state, tuple) or len(state) != 3:
+            return None
+
+        pegs = []
+        seen = 0
+        for peg in state:
+            mask = 0
+            for disk in peg:
+                # Check that each peg contains only disks (integers 1 to N), each disk once
+                if not isinstance(disk, int) or not 1 <= disk <= self.N:
+                    return None
+                bit = 1 << (disk - 1)
+                if seen & bit:
+                    return None
+
+                # Check if disks are properly ordered (smaller disks on top of larger disks),
+                # i.e. each disk must be smaller than the current top disk of the peg
+                if mask and bit > (mask & -mask):
+                    return None
+
+                seen |= bit
+                mask |= bit
+            pegs.append(mask)
+
+        # Check that all disks are accounted for (1 to N)
+        if seen != self._all_disks:
+            return None
+
+        return pegs
 
     def is_valid_move(self, move: Tuple[int, int, int]) -> bool:
         """
@@ -172,34 +373,46 @@ class TowerOfHanoiSimulator(Simulator):
         if not self.is_valid_state():
             return False
 
-        try:
-            disk_id, from_peg, to_peg = move
-
-            # Check if pegs are valid indices
-            if not (0 <= from_peg < 3 and 0 <= to_peg < 3):
-                return False
+        return _is_int_move(move) and self._can_move(*move)
 
-            # Check if source and destination are different
-            if from_peg == to_peg:
-                return False
+    def _can_move(self, disk_id: int, from_peg: int, to_peg: int) -> bool:
+        """
+        Check if a disk can be moved, assuming that the current state is valid. Only the pegs
+        involved in the move are checked, so this takes constant time.
 
-            # Check if source peg has any disks
-            if not self.state[from_peg]:
-                return False
+        Args:
+            disk_id: Integer id of the disk to move
+            from_peg: Integer index of the source peg
+            to_peg: Integer index of the destination peg
 
-            # Check if the disk_id matches the top disk on the source peg
-            if self.state[from_peg][-1] != disk_id:
-                return False
+        Returns:
+            True if the move is valid, False otherwise
+        """
+        # Check if the disk exists
+        if not 1 <= disk_id <= self.N:
+            return False
 
-            # Check if this move is allowed (smaller disk onto larger disk or empty peg)
-            if self.state[to_peg] and disk_id > self.state[to_peg][-1]:
-                return False
+        # Check if pegs are valid indices
+        if not (0 <= from_peg < 3 and 0 <= to_peg < 3):
+            return False
 
-            return True
-        except Exception:
+        # Check if source and destination are different
+        if from_peg == to_peg:
             return False
 
-    def execute_move(self, move: Tuple[int, int, int]) -> bool:
+        pegs = self._pegs
+        if pegs is None:
+            return False  # No moves from an invalid state
+        source = pegs[from_peg]
+        target = pegs[to_peg]
+        disk = 1 << (disk_id - 1)
+
+        # The top disk of a peg is its smallest disk, i.e. the lowest set bit. The disk
+        # must be the top disk of the source peg and smaller than the top disk of the
+        # destination peg, if there is any.
+        return (source & -source) == disk and (not target or disk < (target & -target))
+
+    def execute_move(self, move: Union[Tuple[int, int, int], List[int]]) -> bool:
         """
         Execute a move in the Tower of Hanoi puzzle and update the state.
 
@@ -207,32 +420,87 @@ class TowerOfHanoiSimulator(Simulator):
         if the move is valid and the state after the move is valid.
 
         Args:
-            move: A tuple (disk_id, from_peg, to_peg) for the move
+            move: A tuple or list (disk_id, from_peg, to_peg) for the move
 
         Returns:
             True if the move was successful, False otherwise
         """
-        if not self.is_valid_move(move):
+        if not _is_int_move(move):
             return False
+        return self.execute_move_raw(*move)
 
-        try:
-            disk_id, from_peg, to_peg = move
-
-            # Convert to a mutable representation
-            new_state = [list(pegs) for pegs in self.state]
+    def execute_move_raw(self, disk_id: int, from_peg: int, to_peg: int) -> bool:
+        """
+        Execute a move given as three integers and update the state.
 
-            # Move the disk (we already verified it's the top disk in is_valid_move)
-            disk = new_state[from_peg].pop()
-            assert disk == disk_id, "Disk ID mismatch"
-            new_state[to_peg].append(disk)
+        This is the fast path of execute_move() for callers which already have the move as
+        integers, e.g. solvers generating long move sequences. The types of the arguments
+        are not checked.
 
-            # Convert back to tuple for immutability
-            self.state = tuple(new_state)
-            return True
+        Args:
+            disk_id: Integer id of the disk to move
+            from_peg: Integer index of the source peg
+            to_peg: Integer index of the destination peg
 
-        except Exception:
+        Returns:
+            True if the move was successful, False otherwise
+        """
+        # Bitmask states are valid by construction, so only the move itself has to be checked
+        if not self._can_move(disk_id, from_peg, to_peg):
             return False
 
+        disk = 1 << (disk_id - 1)
+        pegs = self._pegs
+        pegs[from_peg] ^= disk
+        pegs[to_peg] |= disk
+        self._state_version += 1
+        return True
+
+    def execute_moves_batch(self, moves: Sequence[Union[Tuple[int, int, int], List[int]]]) -> int:
+        """
+        Execute a sequence of moves in order, stopping at the first move that is not
+        successful.
+
+        The moves are applied directly to the peg bitmasks with a few integer operations
+        each, instead of going through execute_move() for every move.
+
+        Args:
+            moves: The moves to execute, each a tuple or list (disk_id, from_peg, to_peg)
+
+        Returns:
+            Number of moves executed successfully. If it is smaller than len(moves), the move
+            at this index failed and the remaining moves were not executed.
+        """
+        pegs = self._pegs
+        if pegs is None:
+            return 0  # No moves from an invalid state
+        num_disks = self.N
+        num_successful = 0
+        for move in moves:
+            # The same checks as in _is_int_move and _can_move, inlined to avoid calls per move
+            if not (isinstance(move, (tuple, list)) and len(move) == 3):
+                break
+            disk_id, from_peg, to_peg = move
+            if not (
+                isinstance(disk_id, int) and isinstance(from_peg, int) and isinstance(to_peg, int)
+            ):
+                break
+            if not (1 <= disk_id <= num_disks and 0 <= from_peg < 3 and 0 <= to_peg < 3):
+                break
+            if from_peg == to_peg:
+                break
+            source, target = pegs[from_peg], pegs[to_peg]
+            disk = 1 << (disk_id - 1)
+            if (source & -source) != disk or (target and disk > (target & -target)):
+                break
+            pegs[from_peg] = source ^ disk
+            pegs[to_peg] = target | disk
+            num_successful += 1
+
+        if num_successful:
+            self._state_version += 1
+        return num_successful
+
     def is_valid_state(self) -> bool:
         """
         Check if the current state is valid for the Tower of Hanoi.
@@ -240,40 +508,93 @@ class TowerOfHanoiSimulator(Simulator):
         Returns:
             True if the state is valid, False otherwise
         """
-        state = self.state
-        if not isinstance(state, tuple) or len(state) != 3:
-            return False
-
-        # Check that each peg contains only disks (positive integers)
-        # and that disks are in decreasing order of size from top to bottom
-        # (i.e., smaller disk values represent smaller disks and must be above larger ones)
-        for peg in state:
-            if not all(isinstance(disk, int) and disk > 0 for disk in peg):
-                return False
-
-            # Check if disks are properly ordered (smaller disks on top of larger disks)
-            for i in range(len(peg) - 1):
-                if peg[i] < peg[i + 1]:
-                    return False
-
-        # Check that all disks are accounted for (1 to N)
-        all_disks = sorted([disk for peg in state for disk in peg])
-        expected_disks = list(range(1, self.N + 1))
+        if self._pegs is None:
+            return False  # An assigned state which could not be encoded as bitmasks
 
-        return all_disks == expected_disks
+        # The order of the disks on a peg is implied by the bitmasks, so the state is valid
+        # if every disk is on exactly one peg
+        first, second, third = self._pegs
+        if first & second or first & third or second & third:
+            return False
+        return first | second | third == self._all_disks
 
-    def is_goal_reached(self) -> bool:
+    def _compute_goal_reached(self) -> bool:
         """
         Check if the current state is a goal state (all disks moved to the third peg).
 
         Returns:
             True if all disks are on the third peg, False otherwise
         """
-        if not self.is_valid_state():
-            return False
+        return self._pegs is not None and self._pegs[2] == self._all_disks
+
+
+def _positions_are_safe(positions: bytearray, num_pairs: int) -> bool:
+    """
+    Check the River Crossing constraint: no actor can be with another agent unless their own
+    agent is present.
+
+    Args:
+        positions: Position (0 or 1) of every entity, the actors followed by their agents
+        num_pairs: Number of actor-agent pairs
+
+    Returns:
+        True if no actor is with another agent without their own agent, False otherwise
+    """
+    # Read the positions of all actors and of all agents as one int each, with one bit per
+    # entity, so the whole constraint is checked with a few bitwise operations
+    actor_positions = positions[:num_pairs]
+    agent_positions = positions[num_pairs:]
+    actors = int.from_bytes(actor_positions, "little")
+    agents = int.from_bytes(agent_positions, "little")
+
+    # Actors which are not on the same bank as their own agent
+    unaccompanied = actors ^ agents
 
-        # Goal state: all disks on the third peg
-        return len(self.state[2]) == self.N
+    # They are only safe on a bank without any agent
+    if unaccompanied & actors and agents:
+        return False  # An actor on the right bank with another agent
+    if unaccompanied & ~actors and 0 in agent_positions:
+        return False  # An actor on the left bank with another agent
+    return True
+
+
+# Entities are only shared for puzzle sizes up to this N, larger sizes requested by clients
+# would otherwise keep their entity tables alive in the cache
+MAX_CACHED_RIVER_CROSSING_N = 16
+
+
+def _river_crossing_entities(
+    N: int,
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], Dict[str, int]]:
+    """
+    Get the entities of a River Crossing puzzle with N actor-agent pairs. They are shared
+    between simulators of the same size up to MAX_CACHED_RIVER_CROSSING_N.
+
+    Args:
+        N: Number of actor-agent pairs
+
+    Returns:
+        The actor names, the agent names and the index of every entity in the positions array
+        (actors first, then agents). They must not be modified.
+    """
+    if 0 <= N <= MAX_CACHED_RIVER_CROSSING_N:
+        return _cached_river_crossing_entities(N)
+    return _build_river_crossing_entities(N)
+
+
+def _build_river_crossing_entities(
+    N: int,
+) -> Tuple[Tuple[str, ...], Tuple[str, ...], Dict[str, int]]:
+    """Build the entities of a River Crossing puzzle, see _river_crossing_entities()."""
+    actors = tuple(f"a_{i}" for i in range(1, N + 1))
+    agents = tuple(f"A_{i}" for i in range(1, N + 1))
+    idx = {entity: i for i, entity in enumerate(actors + agents)}
+    return actors, agents, idx
+
+
+_cached_river_crossing_entities = functools.lru_cache(maxsize=MAX_CACHED_RIVER_CROSSING_N + 1)(
+    _build_river_crossing_entities
+)
 
 
 class RiverCrossingSimulator(Simulator):
@@ -307,8 +628,17 @@ class RiverCrossingSimulator(Simulator):
             k: Maximum number of passengers the boat can carry (default: 3)
         """
         self.k = k
-        self.actors = [f"a_{i}" for i in range(1, N + 1)]
-        self.agents = [f"A_{i}" for i in range(1, N + 1)]
+        # The entity names only depend on N, so simulators of the same size share them
+        self.actors, self.agents, self._idx = _river_crossing_entities(N)
+        # The state is stored as the boat position and a bytearray with the position of
+        # every entity. The state tuple is only built from them when it is read. An assigned
+        # state which cannot be encoded is kept as given instead, with _positions None.
+        self._boat: Any = 0
+        self._positions: Optional[bytearray] = None
+        self._invalid_state: Any = None
+        # The entity positions are decoded once per state and copied on every read
+        self._state_cache: Optional[Tuple[int, Dict[str, int]]] = None
+        self._valid_cache: Optional[Tuple[int, bool]] = None  # (state version, state valid)
         super().__init__(N)
 
     @property
@@ -323,6 +653,89 @@ class RiverCrossingSimulator(Simulator):
         params["k"] = self.k
         return params
 
+    @property
+    def state(self) -> Tuple[int, Dict[str, int]]:
+        """
+        Get the current state in the format (boat_position, entity_positions). Every call
+        returns a new dictionary, so modifying it does not change the simulator.
+
+        Returns:
+            The current state
+        """
+        if self._positions is None:
+            return copy.deepcopy(self._invalid_state)
+
+        cache = self._state_cache
+        if cache is None or cache[0] != self._state_version:
+            cache = self._cache_state()
+        return self._boat, dict(cache[1])
+
+    @state.setter
+    def state(self, state: Tuple[int, Dict[str, int]]) -> None:
+        """
+        Set the current state without validating it, use reset() to validate it. An invalid
+        state is kept and reported by is_valid_state().
+        """
+        self._boat, self._positions = self._encode_state(state)
+        self._state_version += 1
+        if self._positions is None:
+            self._invalid_state = copy.deepcopy(state)
+        else:
+            self._invalid_state = None
+            self._cache_state()
+
+    def _cache_state(self) -> Tuple[int, Dict[str, int]]:
+        """
+        Decode the entity positions of the current state and cache them.
+
+        Returns:
+            The state version and the entity positions
+        """
+        positions = dict(zip(self._idx, self._positions or ()))
+        cache = self._state_cache = (self._state_version, positions)
+        return cache
+
+    def clone(self) -> "RiverCrossingSimulator":
+        """
+        Create an independent copy of this simulator in its current state.
+
+        Returns:
+            A simulator with the same parameters in the same state
+        """
+        clone = super().clone()
+        if self._positions is not None:
+            clone._positions = bytearray(self._positions)
+        return clone
+
+    def _encode_state(self, state: Any) -> Tuple[Any, Optional[bytearray]]:
+        """
+        Convert a state in the format (boat_position, entity_positions) into the boat
+        position and the array of entity positions.
+
+        Args:
+            state: The state to convert
+
+        Returns:
+            The boat position and the entity positions. The entity positions are None if they
+            do not contain exactly the entities of this simulator, each on bank 0 or 1.
+        """
+        if not (isinstance(state, (tuple, list)) and len(state) == 2):
+            return None, None
+        boat_position, entity_positions = state
+
+        # With the same number of entries, the lookup of every entity below also ensures that
+        # there are no unknown entities
+        if not isinstance(entity_positions, dict) or len(entity_positions) != len(self._idx):
+            return boat_position, None
+
+        positions = bytearray(len(self._idx))
+        for entity, i in self._idx.items():
+            position = entity_positions.get(entity)
+            if not (isinstance(position, int) and 0 <= position <= 1):
+                return boat_position, None
+            positions[i] = position
+        return boat_position, positions
+
     def reset(
         self,
         state: Optional[Union[Tuple[int, Dict[str, int]], List[Union[int, Dict[str, int]]]]] = None,
@@ -339,24 +752,18 @@ class RiverCrossingSimulator(Simulator):
             ValueError: If the provided state is not valid.
         """
         if state is not None:
-            old_state = self.state
-            # Cast list to tuple if needed
-            if isinstance(state, list):
-                state = tuple(state)
-            self.state = state
-            if not self.is_valid_state():
-                self.state = old_state
+            boat_position, positions = self._encode_state(state)
+            if not self._check_state(boat_position, positions, self.N):
                 raise ValueError("Provided state is not a valid River Crossing state.")
         else:
-            # State format: (boat_position, {entity: position})
             # Position: 0 = left bank, 1 = right bank
-            entity_positions = {}
-            for actor in self.actors:
-                entity_positions[actor] = 0
-            for agent in self.agents:
-                entity_positions[agent] = 0
+            boat_position, positions = 0, bytearray(len(self._idx))
 
-            self.state = (0, entity_positions)  # (boat_position, entity_positions)
+        self._boat = boat_position
+        self._positions = positions
+        self._invalid_state = None
+        self._state_version += 1
+        self._valid_cache = (self._state_version, True)
 
     def is_valid_move(self, move: List[str]) -> bool:
         """
@@ -371,38 +778,58 @@ class RiverCrossingSimulator(Simulator):
         Returns:
             True if the move is valid, False otherwise
         """
-        if not self.is_valid_state():
-            return False
+        indices = self._move_indices(move)
+        return indices is not None and self._is_valid_move_indices(indices)
 
-        try:
-            boat_position, entity_positions = self.state
+    def _move_indices(self, move: List[str]) -> Optional[List[int]]:
+        """
+        Resolve the entity names of a move into their indices in the positions array. The
+        names are only looked up here, all further checks work on the indices.
 
-            # Check if the move is a valid list
-            if not isinstance(move, list) or not move:
-                return False
+        Args:
+            move: List of actors and/or agents to move across the river
 
-            # Check passenger count constraint
-            if len(move) > self.k:
-                return False
+        Returns:
+            The indices of the passengers, or None if the move is not a list of entity names
+        """
+        # Check if the move is a valid list
+        if not isinstance(move, list):
+            return None
 
-            # Check if all passengers are valid entities
-            all_entities = self.actors + self.agents
-            if not all(passenger in all_entities for passenger in move):
-                return False
+        # Check if all passengers are valid entities
+        idx = self._idx
+        indices = []
+        for passenger in move:
+            i = idx.get(passenger) if isinstance(passenger, str) else None
+            if i is None:
+                return None
+            indices.append(i)
+        return indices
 
-            # Check for duplicates in the move
-            if len(move) != len(set(move)):
-                return False
+    def _is_valid_move_indices(self, indices: Sequence[int]) -> bool:
+        """
+        Check if a move given as entity indices is valid for the current state.
 
-            # Check if all passengers are at the same side as the boat
-            if not all(entity_positions[passenger] == boat_position for passenger in move):
-                return False
+        Args:
+            indices: Integer indices of the actors and/or agents to move across the river
 
-            return True
+        Returns:
+            True if the move is valid, False otherwise
+        """
+        if not self.is_valid_state():
+            return False
 
-        except Exception:
+        # Check passenger count constraint, that the boat does not go empty and for
+        # duplicates in the move
+        if not 0 < len(indices) <= self.k or len(set(indices)) != len(indices):
             return False
 
+        # Check if all passengers exist and are at the same side as the boat
+        positions = self._positions
+        boat_position = self._boat
+        num_entities = len(positions)
+        return all(0 <= i < num_entities and positions[i] == boat_position for i in indices)
+
     def execute_move(self, move: List[str]) -> bool:
         """
         Execute a move in the river crossing puzzle and update the state.
@@ -416,87 +843,114 @@ class RiverCrossingSimulator(Simulator):
         Returns:
             True if the move was successful, False otherwise
         """
-        if not self.is_valid_move(move):
-            return False
+        indices = self._move_indices(move)
+        return indices is not None and self.execute_move_indices(indices)
 
-        try:
-            boat_position, entity_positions = self.state
+    def execute_move_indices(self, indices: Sequence[int]) -> bool:
+        """
+        Execute a move given as entity indices instead of names and update the state.
 
-            # Calculate new positions after the move
-            new_boat_position = 1 - boat_position
-            new_entity_positions = entity_positions.copy()
-            for passenger in move:
-                new_entity_positions[passenger] = new_boat_position
+        This is the fast path of execute_move() for callers which resolved the entities once,
+        it skips the name lookups of every move. Actor a_i has index i - 1 and agent A_i has
+        index N + i - 1. The types of the indices are not checked.
 
-            # Create the new state
-            new_state = (new_boat_position, new_entity_positions)
+        Args:
+            indices: Integer indices of the actors and/or agents to move across the river
 
-            # Check if the new state would be valid
-            temp_simulator = RiverCrossingSimulator(self.N, self.k)
-            temp_simulator.state = new_state
-            if not temp_simulator.is_valid_state():
-                return False
+        Returns:
+            True if the move was successful, False otherwise
+        """
+        if not self._is_valid_move_indices(indices):
+            return False
+
+        return self._cross(indices)
+
+    def _cross(self, indices: Sequence[int]) -> bool:
+        """
+        Move the boat with the entities at the given indices to the other bank, if the
+        resulting state is valid. The entities must be on the same bank as the boat.
 
-            # Update state
-            self.state = new_state
-            return True
+        Args:
+            indices: Indices of the passengers in the positions array
 
-        except Exception:
+        Returns:
+            True if the passengers crossed the river, False otherwise
+        """
+        positions = self._positions
+        boat_position = self._boat
+        new_boat_position = 1 - boat_position
+
+        # Move the passengers in place and move them back if the new state is not valid
+        for i in indices:
+            positions[i] = new_boat_position
+        if not _positions_are_safe(positions, self.N):
+            for i in indices:
+                positions[i] = boat_position
             return False
 
+        self._boat = new_boat_position
+        self._state_version += 1
+        # The safety check above already validated the new state
+        self._valid_cache = (self._state_version, True)
+        return True
+
     def is_valid_state(self) -> bool:
         """
-        Check if the current state is valid for the river crossing puzzle.
+        Check if the current state is valid for the river crossing puzzle. The result is
+        cached until the state is changed.
 
         Returns:
             True if the state is valid, False otherwise
         """
-        try:
-            boat_position, entity_positions = self.state
-
-            # Check boat position is valid
-            if boat_position not in (0, 1):
-                return False
-
-            # Check all entities are accounted for
-            all_entities = self.actors + self.agents
-            if set(entity_positions.keys()) != set(all_entities):
-                return False
-
-            # Check all positions are valid
-            if not all(pos in (0, 1) for pos in entity_positions.values()):
-                return False
-
-            # Check the constraint: no actor can be with another agent unless their own agent is present
-            for i, actor in enumerate(self.actors):
-                actor_agent = self.agents[i]  # corresponding agent
-                actor_pos = entity_positions[actor]
-
-                # Check each agent that is at the same location as the actor
-                for j, agent in enumerate(self.agents):
-                    if i == j:  # Skip actor's own agent
-                        continue
-
-                    if entity_positions[agent] == actor_pos:
-                        # Another agent is present with this actor
-                        if entity_positions[actor_agent] != actor_pos:
-                            return False  # Actor's own agent must also be present
-        except Exception:
+        cache = self._valid_cache
+        if cache is None or cache[0] != self._state_version:
+            valid = self._check_state(self._boat, self._positions, self.N)
+            cache = self._valid_cache = (self._state_version, valid)
+        return cache[1]
+
+    @staticmethod
+    def _check_state(boat_position: Any, positions: Optional[bytearray], num_pairs: int) -> bool:
+        """
+        Check if a boat position and array of entity positions form a valid state. Candidate
+        states are checked without assigning them to a simulator.
+
+        Args:
+            boat_position: Position of the boat
+            positions: Position of every entity, or None if they could not be encoded
+            num_pairs: Number of actor-agent pairs
+
+        Returns:
+            True if the state is valid, False otherwise
+        """
+        # Check boat position is valid
+        if not (isinstance(boat_position, int) and 0 <= boat_position <= 1):
             return False
-        return True
 
-    def is_goal_reached(self) -> bool:
+        # Check all entities are accounted for and all positions are valid
+        if positions is None:
+            return False
+
+        return _positions_are_safe(positions, num_pairs)
+
+    def _compute_goal_reached(self) -> bool:
         """
         Check if the current state is the goal state (all entities on the right bank).
 
         Returns:
             True if all entities are on the right bank, False otherwise
         """
-        try:
-            _, entity_positions = self.state
-            return all(position == 1 for position in entity_positions.values())
-        except Exception:
-            return False
+        # Encoded positions are always 0 or 1, no further validation is needed
+        positions = self._positions
+        return positions is not None and 0 not in positions
+
+
+# Functions creating a simulator from its parameters, by simulator type
+_SIMULATOR_FACTORIES: Dict[SimulationType, Callable[[Dict[str, Any]], Simulator]] = {
+    SimulationType.TowerOfHanoi: lambda params: TowerOfHanoiSimulator(N=params["N"]),
+    SimulationType.RiverCrossing: lambda params: RiverCrossingSimulator(
+        N=params["N"], k=params.get("k", 3)
+    ),
+}
 
 
 def create_simulator(simulator_type: SimulationType, params: Dict[str, Any]) -> Simulator:
@@ -513,9 +967,7 @@ def create_simulator(simulator_type: SimulationType, params: Dict[str, Any]) ->
     Raises:
         ValueError: If the simulator type is unknown
     """
-    if simulator_type == SimulationType.TowerOfHanoi:
-        return TowerOfHanoiSimulator(N=params["N"])
-    elif simulator_type == SimulationType.RiverCrossing:
-        return RiverCrossingSimulator(N=params["N"], k=params.get("k", 3))
-    else:
+    factory = _SIMULATOR_FACTORIES.get(simulator_type)
+    if factory is None:
         raise ValueError(f"Unknown simulator type: {simulator_type}")
+    return factory(params)
@@ -73,3 +73,103 @@ def test_reset_with_invalid_state(hanoi):
     invalid_state = ([4, 3, 2, 1], [], [])
     with pytest.raises(ValueError):
         hanoi.reset(invalid_state)
+
+
+def test_execute_move_as_list(hanoi):
+    # Moves decoded from JSON are lists instead of tuples
+    assert hanoi.execute_move([1, 0, 2])
+    assert hanoi.state == ([3, 2], [], [1])
+    assert not hanoi.execute_move([1, 0])
+
+
+def test_goal_state_cache_is_updated():
+    hanoi = TowerOfHanoiSimulator(1)
+    assert not hanoi.is_goal_reached()
+    assert hanoi.execute_move((1, 0, 2))
+    assert hanoi.is_goal_reached()
+    hanoi.reset()
+    assert not hanoi.is_goal_reached()
+    hanoi.reset(([], [], [1]))
+    assert hanoi.is_goal_reached()
+
+
+def test_execute_moves_batch(hanoi):
+    # Execution stops at the invalid second move
+    assert hanoi.execute_moves_batch([(1, 0, 2), (1, 0, 1), (2, 0, 1)]) == 1
+    assert hanoi.state == ([3, 2], [], [1])
+
+    assert hanoi.execute_moves_batch([(2, 0, 1), (1, 2, 1)]) == 2
+    assert hanoi.state == ([3], [2, 1], [])
+
+
+def test_execute_moves_batch_matches_execute_move(hanoi):
+    moves = [[1, 0, 2], [2, 0, 1], [1, 2, 1], [3, 0, 2], [1, 1, 0], [2, 1, 2], [1, 0, 2]]
+    reference = TowerOfHanoiSimulator(N=3)
+    assert all(reference.execute_move(move) for move in moves)
+
+    assert hanoi.execute_moves_batch(moves) == len(moves)
+    assert hanoi.state == reference.state
+    assert hanoi.is_goal_reached()
+
+
+@pytest.mark.parametrize(
+    "bad_move", [[1, 0], [1, 0, 0], [1, 0, 3], [1, "0", 2], [0, 0, 2], [10**18, 0, 2], None]
+)
+def test_execute_moves_batch_stops_at_malformed_move(hanoi, bad_move):
+    assert hanoi.execute_moves_batch([[1, 0, 2], bad_move, [2, 0, 1]]) == 1
+    assert hanoi.state == ([3, 2], [], [1])
+
+
+def test_state_is_not_changed_by_later_moves(hanoi):
+    state = hanoi.state
+    assert hanoi.execute_move((1, 0, 2))
+    assert state == ([3, 2, 1], [], [])
+    assert hanoi.state == ([3, 2], [], [1])
+
+
+def test_modifying_state_does_not_change_simulator(hanoi):
+    hanoi.state[0].append(9)
+    assert hanoi.state == ([3, 2, 1], [], [])
+    assert hanoi.execute_move((1, 0, 2))
+
+
+def test_execute_move_raw(hanoi):
+    assert hanoi.execute_move_raw(1, 0, 2)
+    assert not hanoi.execute_move_raw(2, 0, 2)
+    assert not hanoi.execute_move_raw(4, 0, 1)
+    assert hanoi.state == ([3, 2], [], [1])
+
+
+@pytest.mark.parametrize(
+    "state", [([3, 2, "1"], [], []), ([3, 2], [1.0], []), ([3, 2, 0], [1], [])]
+)
+def test_reset_rejects_non_disk_values(hanoi, state):
+    # Disks are only type checked when a state enters the simulator
+    with pytest.raises(ValueError):
+        hanoi.reset(state)
+    assert hanoi.state == ([3, 2, 1], [], [])
+
+
+def test_clone(hanoi):
+    assert hanoi.execute_move((1, 0, 2))
+    clone = hanoi.clone()
+    assert clone.state == hanoi.state
+
+    # Moves in the clone do not change the original
+    assert clone.execute_move((2, 0, 1))
+    assert clone.state == ([3], [2], [1])
+    assert hanoi.state == ([3, 2], [], [1])
+
+
+def test_assigning_invalid_state(hanoi):
+    # Assigned states are not validated, unlike states passed to reset()
+    hanoi.state = ([1, 2, 3], [], [])
+    assert hanoi.state == ([1, 2, 3], [], [])
+    assert not hanoi.is_valid_state()
+    assert not hanoi.execute_move((1, 0, 2))
+    assert hanoi.execute_moves_batch([(1, 0, 2)]) == 0
+    assert hanoi.clone().state == ([1, 2, 3], [], [])
+
+    hanoi.state = ([3, 2], [], [1])
+    assert hanoi.is_valid_state()
+    assert hanoi.execute_move((1, 2, 1))
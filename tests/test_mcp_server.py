@@ -1,54 +1,34 @@
 import asyncio
-import json
-import os
-import pathlib
 from typing import Any, Dict, List, Tuple
 
 import pytest
 import pytest_asyncio
 from fastmcp import Client
+from mcp.types import TextContent
+from orjson import loads as json_loads
 
+from illusion_of_thinking import mcp_server
 from illusion_of_thinking.constants import SimulationType
+from illusion_of_thinking.mcp_server import SimulationManager
 
 
-@pytest_asyncio.fixture
+@pytest_asyncio.fixture(scope="session")
 async def client():
-    """Fixture that creates a connected client using stdio transport."""
-    # Get the absolute path to the server script by resolving it relative to this test file
-    current_dir = pathlib.Path(__file__).parent
-    server_path = str(current_dir.parent / "illusion_of_thinking" / "mcp_server.py")
-
-    # Verify the file exists before trying to create a client
-    if not os.path.exists(server_path):
-        raise FileNotFoundError(f"Server script not found at: {server_path}")
-
-    # Connect to the script file using absolute path
-    client = Client(server_path)
+    """
+    Fixture that creates a client connected to the server in the same process. The client
+    is shared by all tests.
+    """
+    client = Client(mcp_server.mcp)
     async with client:
         yield client
 
 
-def result_as_dict(result: Any) -> Dict[str, Any]:
-    """Helper function to convert result to a dictionary."""
-    if isinstance(result, list) and len(result) == 1:
-        result = result[0]  # Extract the first result item
-        if hasattr(result, "text"):
-            try:
-                return json.loads(result.text)
-            except json.JSONDecodeError:
-                return {"text": result.text}
-
-    # For direct tool results
-    if hasattr(result, "content"):
-        try:
-            return json.loads(result.content)
-        except (json.JSONDecodeError, AttributeError, TypeError):
-            if isinstance(result.content, dict):
-                return result.content
-            return {"content": result.content}
-
-    # Return the result as is if we can't process it
-    return result
+def result_as_dict(result: List[TextContent]) -> Dict[str, Any]:
+    """
+    Helper function to convert result to a dictionary. Tool calls return a list with a
+    single text content, which holds the JSON serialized return value of the tool.
+    """
+    return json_loads(result[0].text)
 
 
 async def call_tool(client: Client, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
@@ -57,7 +37,48 @@ async def call_tool(client: Client, tool_name: str, args: Dict[str, Any]) -> Dic
     return result_as_dict(result)
 
 
-@pytest.mark.asyncio
+async def call_tool_contains(
+    client: Client, tool_name: str, args: Dict[str, Any], needle: str
+) -> bool:
+    """Call a tool and check whether its JSON result contains needle, without decoding it."""
+    result = await client.call_tool(tool_name, args)
+    return needle in result[0].text
+
+
+@pytest_asyncio.fixture(scope="module")
+async def hanoi_env_id(client) -> str:
+    """Fixture that creates a Tower of Hanoi environment with N=3 once per module."""
+    result = await call_tool(
+        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3}
+    )
+    return result["env_id"]
+
+
+@pytest_asyncio.fixture(scope="module")
+async def river_env_id(client) -> str:
+    """Fixture that creates a River Crossing environment with N=2 and k=2 once per module."""
+    result = await call_tool(
+        client,
+        "init_simulator",
+        {"simulator_type": SimulationType.RiverCrossing.name, "N": 2, "k": 2},
+    )
+    return result["env_id"]
+
+
+@pytest_asyncio.fixture
+async def hanoi_env(client, hanoi_env_id) -> str:
+    """Fixture that returns the ID of the shared Tower of Hanoi environment in its initial state."""
+    await call_tool(client, "reset_simulator", {"env_id": hanoi_env_id})
+    return hanoi_env_id
+
+
+@pytest_asyncio.fixture
+async def river_env(client, river_env_id) -> str:
+    """Fixture that returns the ID of the shared River Crossing environment in its initial state."""
+    await call_tool(client, "reset_simulator", {"env_id": river_env_id})
+    return river_env_id
+
+
 async def test_init_simulator(client):
     """Test initializing a Tower of Hanoi simulator."""
     # Initialize a Tower of Hanoi simulator
@@ -70,7 +91,6 @@ async def test_init_simulator(client):
     assert result["simulator_params"] == {"N": 3}
 
 
-@pytest.mark.asyncio
 async def test_init_river_crossing(client):
     """Test initializing a River Crossing simulator."""
     # Initialize a River Crossing simulator
@@ -84,15 +104,7 @@ async def test_init_river_crossing(client):
     assert result["simulator_type"] == SimulationType.RiverCrossing.name
     assert result["simulator_params"] == {"N": 2, "k": 2}
 
-    # Verify the environment exists by checking state resource
-    env_id = result["env_id"]
-    state_data = await call_tool(client, "get_state", {"env_id": env_id})
-    assert state_data["simulator_type"] == SimulationType.RiverCrossing.name
-    assert state_data["simulator_params"] == {"N": 2, "k": 2}
-    assert state_data["goal_reached"] is False
-
 
-@pytest.mark.asyncio
 async def test_init_hanoi(client):
     """Test initializing a River Crossing simulator."""
     # Initialize a River Crossing simulator
@@ -104,76 +116,53 @@ async def test_init_hanoi(client):
     assert result["simulator_type"] == SimulationType.TowerOfHanoi.name
     assert result["simulator_params"] == {"N": 2}
 
-    # Verify the environment exists by checking state resource
-    env_id = result["env_id"]
-    state_data = await call_tool(client, "get_state", {"env_id": env_id})
-    assert state_data["simulator_type"] == SimulationType.TowerOfHanoi.name
-    assert state_data["simulator_params"] == {"N": 2}
-    assert state_data["goal_reached"] is False
-
-
-@pytest.mark.asyncio
-async def test_init_simulator_validation(client):
-    """Test validation when initializing a simulator."""
-    # Test with invalid simulator type
-    result = await call_tool(client, "init_simulator", {"simulator_type": "InvalidType", "N": 3})
-    assert "error" in result
-    assert "Invalid simulator type" in result["error"]
-
-    # Test with invalid N value
-    result = await call_tool(
-        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 0}
-    )
-    assert "error" in result
-    assert "N must be at least 1" in result["error"]
-
-    # Test with invalid k value
-    result = await call_tool(
-        client,
-        "init_simulator",
-        {"simulator_type": SimulationType.RiverCrossing.name, "N": 2, "k": 0},
-    )
-    assert "error" in result
-    assert "k must be at least 1" in result["error"]
 
-
-@pytest.mark.asyncio
-async def test_execute_moves_tower_of_hanoi(client):
-    """Test executing a move in the Tower of Hanoi simulator."""
-    # Initialize a Tower of Hanoi simulator
-    init_result = await call_tool(
-        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3}
-    )
-    env_id = init_result["env_id"]
-
-    # Execute a valid move: move disk 1 from peg 0 to peg 2
-    move_result = await call_tool(
-        client, "execute_moves", {"env_id": env_id, "moves": [[1, 0, 2], [2, 0, 1]]}
-    )
+@pytest.mark.parametrize(
+    "tool_name, args, expected_error",
+    [
+        ("init_simulator", {"simulator_type": "InvalidType", "N": 3}, "Invalid simulator type"),
+        (
+            "init_simulator",
+            {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 0},
+            "N must be at least 1",
+        ),
+        (
+            "init_simulator",
+            {"simulator_type": SimulationType.RiverCrossing.name, "N": 2, "k": 0},
+            "k must be at least 1",
+        ),
+        (
+            "execute_moves",
+            {"env_id": "invalid_id", "moves": [[1, 0, 2]]},
+            "Environment not found",
+        ),
+        ("reset_simulator", {"env_id": "invalid_id", "state": None}, "Environment not found"),
+        ("get_state", {"env_id": "invalid_id"}, "Environment not found"),
+    ],
+)
+async def test_tool_validation(client, tool_name, args, expected_error):
+    """Test that the tools return an error for invalid arguments."""
+    assert await call_tool_contains(client, tool_name, args, expected_error)
+
+
+async def test_execute_moves_tower_of_hanoi(client, hanoi_env):
+    """Test solving the Tower of Hanoi simulator with a single call."""
+    # Optimal solution for 3 disks
+    moves = [[1, 0, 2], [2, 0, 1], [1, 2, 1], [3, 0, 2], [1, 1, 0], [2, 1, 2], [1, 0, 2]]
+    move_result = await call_tool(client, "execute_moves", {"env_id": hanoi_env, "moves": moves})
 
     assert move_result["all_moves_successful"]
-    assert not move_result["goal_reached"]
+    assert len(move_result["move_results"]) == 7
     assert isinstance(move_result["final_state"], list)  # State should be a tuple of lists
-    assert len(move_result["final_state"]) == 3  # 3 pegs
-    assert 3 in move_result["final_state"][0]
-    assert 2 in move_result["final_state"][1]
-    assert 1 in move_result["final_state"][2]
+    assert move_result["final_state"] == [[], [], [3, 2, 1]]  # All disks on the last peg
+    assert move_result["goal_reached"] is True
 
 
-@pytest.mark.asyncio
-async def test_execute_moves_river_crossing(client):
+async def test_execute_moves_river_crossing(client, river_env):
     """Test executing a move in the River Crossing simulator."""
-    # Initialize a River Crossing simulator
-    init_result = await call_tool(
-        client,
-        "init_simulator",
-        {"simulator_type": SimulationType.RiverCrossing.name, "N": 2, "k": 2},
-    )
-    env_id = init_result["env_id"]
-
     # Execute a valid move: move actor a_1 and agent A_1 to other side
     move_result = await call_tool(
-        client, "execute_moves", {"env_id": env_id, "moves": [["a_1", "A_1"]]}
+        client, "execute_moves", {"env_id": river_env, "moves": [["a_1", "A_1"]]}
     )
 
     assert move_result["all_moves_successful"]
@@ -188,45 +177,34 @@ async def test_execute_moves_river_crossing(client):
     assert entity_positions["A_1"] == 1
 
 
-@pytest.mark.asyncio
-async def test_execute_moves_validation(client):
-    """Test validation when executing a move."""
-    # Initialize a Tower of Hanoi simulator
-    init_result = await call_tool(
-        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3}
-    )
-    env_id = init_result["env_id"]
-
-    # Test with invalid env_id
-    result = await call_tool(
-        client, "execute_moves", {"env_id": "invalid_id", "moves": [[1, 0, 2]]}
-    )
-    assert "error" in result
-    assert "Environment not found" in result["error"]
-
+async def test_execute_moves_validation(client, hanoi_env):
+    """Test executing an invalid move."""
     # Test with invalid move (moving disk from empty peg)
     result = await call_tool(
         client,
         "execute_moves",
-        {"env_id": env_id, "moves": [[1, 1, 2]]},  # Peg 1 is empty at the start
+        {"env_id": hanoi_env, "moves": [[1, 1, 2]]},  # Peg 1 is empty at the start
     )
     assert result["all_moves_successful"] is False
 
 
-@pytest.mark.asyncio
-async def test_reset_simulator(client):
-    """Test resetting a simulator."""
-    # Initialize a Tower of Hanoi simulator
-    init_result = await call_tool(
-        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3}
-    )
-    env_id = init_result["env_id"]
+async def test_execute_no_moves(client, hanoi_env):
+    """Test executing an empty list of moves."""
+    move_result = await call_tool(client, "execute_moves", {"env_id": hanoi_env, "moves": []})
+
+    assert move_result["all_moves_successful"] is True
+    assert move_result["move_results"] == []
+    assert move_result["final_state"] == [[3, 2, 1], [], []]
+    assert move_result["goal_reached"] is False
 
+
+async def test_reset_simulator(client, hanoi_env):
+    """Test resetting a simulator."""
     # Make a move
-    await call_tool(client, "execute_moves", {"env_id": env_id, "moves": [[1, 0, 2]]})
+    await call_tool(client, "execute_moves", {"env_id": hanoi_env, "moves": [[1, 0, 2]]})
 
     # Reset to default state
-    reset_result = await call_tool(client, "reset_simulator", {"env_id": env_id, "state": None})
+    reset_result = await call_tool(client, "reset_simulator", {"env_id": hanoi_env, "state": None})
 
     assert reset_result["reset_successful"] is True
     # After reset, all disks should be on the first peg
@@ -236,19 +214,12 @@ async def test_reset_simulator(client):
     assert len(state[2]) == 0  # 0 disks on third peg
 
 
-@pytest.mark.asyncio
-async def test_reset_simulator_custom_state(client):
+async def test_reset_simulator_custom_state(client, hanoi_env):
     """Test resetting a simulator to a custom state."""
-    # Initialize a Tower of Hanoi simulator
-    init_result = await call_tool(
-        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3}
-    )
-    env_id = init_result["env_id"]
-
     # Reset to a custom state
     custom_state = [[3, 2], [1], []]  # Disk 1 on peg 1, others on peg 0
     reset_result = await call_tool(
-        client, "reset_simulator", {"env_id": env_id, "state": custom_state}
+        client, "reset_simulator", {"env_id": hanoi_env, "state": custom_state}
     )
 
     assert reset_result["reset_successful"] is True
@@ -258,26 +229,14 @@ async def test_reset_simulator_custom_state(client):
     assert state[2] == []  # No disks on third peg
 
 
-@pytest.mark.asyncio
-async def test_reset_simulator_validation(client):
-    """Test validation when resetting a simulator."""
-    # Initialize a Tower of Hanoi simulator
-    init_result = await call_tool(
-        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3}
-    )
-    env_id = init_result["env_id"]
-
-    # Test with invalid env_id
-    result = await call_tool(client, "reset_simulator", {"env_id": "invalid_id", "state": None})
-    assert "error" in result
-    assert "Environment not found" in result["error"]
-
+async def test_reset_simulator_validation(client, hanoi_env):
+    """Test resetting a simulator to an invalid state."""
     # Test with invalid state format
     result = await call_tool(
         client,
         "reset_simulator",
         {
-            "env_id": env_id,
+            "env_id": hanoi_env,
             "state": "invalid_state",  # Not None or "default", and not a valid state list
         },
     )
@@ -285,17 +244,10 @@ async def test_reset_simulator_validation(client):
     assert result["reset_successful"] is False
 
 
-@pytest.mark.asyncio
-async def test_state_resource(client):
+async def test_state_resource(client, hanoi_env):
     """Test accessing the state resource."""
-    # Initialize a Tower of Hanoi simulator
-    init_result = await call_tool(
-        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3}
-    )
-    env_id = init_result["env_id"]
-
     # Access the state resource
-    state_data = await call_tool(client, "get_state", {"env_id": env_id})
+    state_data = await call_tool(client, "get_state", {"env_id": hanoi_env})
 
     assert state_data["simulator_type"] == "TowerOfHanoi"
     assert state_data["simulator_params"] == {"N": 3}
@@ -304,15 +256,175 @@ async def test_state_resource(client):
     assert state_data["goal_reached"] is False
 
 
-@pytest.mark.asyncio
-async def test_state_resource_validation(client):
-    """Test validation when accessing the state resource."""
-    # Initialize a simulator
-    init_result = await call_tool(
-        client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3}
+async def test_batch_execute(client):
+    """Test executing operations on several environments with one request."""
+    hanoi_init, river_init = await asyncio.gather(
+        call_tool(
+            client, "init_simulator", {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 2}
+        ),
+        call_tool(
+            client,
+            "init_simulator",
+            {"simulator_type": SimulationType.RiverCrossing.name, "N": 2, "k": 2},
+        ),
+    )
+    hanoi_env_id, river_env_id = hanoi_init["env_id"], river_init["env_id"]
+
+    result = await call_tool(
+        client,
+        "batch_execute",
+        {
+            "ops": [
+                {
+                    "tool": "execute_moves",
+                    "args": {"env_id": hanoi_env_id, "moves": [[1, 0, 1], [2, 0, 2], [1, 1, 2]]},
+                },
+                {"tool": "execute_moves", "args": {"env_id": river_env_id, "moves": [["a_1"]]}},
+                {"tool": "get_state", "args": {"env_id": "invalid_id"}},
+                {"tool": "invalid_tool", "args": {}},
+            ]
+        },
+    )
+
+    hanoi_result, river_result, state_result, invalid_result = result["results"]
+    assert hanoi_result["all_moves_successful"] is True
+    assert hanoi_result["goal_reached"] is True
+    assert river_result["all_moves_successful"] is True
+    assert river_result["final_state"][0] == 1
+    assert "Environment not found" in state_result["error"]
+    assert "Invalid tool" in invalid_result["error"]
+
+
+async def test_batch_execute_stop_on_error(client):
+    """Test that a batch stops at the first failing operation if requested."""
+    result = await call_tool(
+        client,
+        "batch_execute",
+        {
+            "ops": [
+                {"tool": "init_simulator", "args": {"simulator_type": "InvalidType", "N": 3}},
+                {
+                    "tool": "init_simulator",
+                    "args": {"simulator_type": SimulationType.TowerOfHanoi.name, "N": 3},
+                },
+            ],
+            "stop_on_error": True,
+        },
+    )
+
+    assert len(result["results"]) == 1
+    assert "Invalid simulator type" in result["results"][0]["error"]
+
+
+async def test_batch_execute_failing_operations(client, monkeypatch):
+    """Test that failing operations of a batch only produce an error result."""
+    env = mcp_server.simulation_manager.create_environment(SimulationType.TowerOfHanoi, {"N": 3})
+
+    def failing_execute_moves_batch(moves):
+        raise RuntimeError("Simulator failure")
+
+    monkeypatch.setattr(env.simulator, "execute_moves_batch", failing_execute_moves_batch)
+
+    result = await call_tool(
+        client,
+        "batch_execute",
+        {
+            "ops": [
+                {"tool": "execute_moves", "args": {"env_id": env.id, "moves": [[1, 0, 2]]}},
+                {"tool": ["init_simulator"], "args": {}},
+                {"tool": "init_simulator", "args": {"simulator_type": "TowerOfHanoi"}},
+                {"tool": "get_state", "args": {"env_id": env.id}},
+            ]
+        },
     )
 
-    # Test with invalid env_id
-    state_data = await call_tool(client, "get_state", {"env_id": "invalid_id"})
-    assert "error" in state_data
-    assert "Environment not found" in state_data["error"]
+    failing_result, unhashable_result, missing_arg_result, state_result = result["results"]
+    assert "Simulator failure" in failing_result["error"]
+    assert "Invalid tool" in unhashable_result["error"]
+    assert "Invalid arguments" in missing_arg_result["error"]
+    assert state_result["state"] == [[3, 2, 1], [], []]
+
+
+async def test_batch_execute_coerces_arguments(client):
+    """Test that the arguments of an operation are coerced like for a direct tool call."""
+    result = await call_tool(
+        client,
+        "batch_execute",
+        {"ops": [{"tool": "init_simulator", "args": {"simulator_type": "TowerOfHanoi", "N": "3"}}]},
+    )
+
+    assert result["results"][0]["simulator_params"] == {"N": 3}
+
+
+def test_cleanup_inactive_environments():
+    """Test that only expired environments are removed during cleanup."""
+    manager = SimulationManager()
+    env_a = manager.create_environment(SimulationType.TowerOfHanoi, {"N": 3})
+    env_b = manager.create_environment(SimulationType.TowerOfHanoi, {"N": 3})
+    env_c = manager.create_environment(SimulationType.RiverCrossing, {"N": 2, "k": 2})
+
+    # Accessing an environment moves it to the end of the access order
+    env_a.last_accessed -= manager.access_resolution
+    manager.get_environment(env_a.id)
+    assert list(manager.environments) == [env_b.id, env_c.id, env_a.id]
+
+    env_b.last_accessed -= manager.inactive_threshold + 1
+    manager.cleanup_inactive_environments()
+
+    assert not manager.validate_environment(env_b.id)
+    assert manager.validate_environment(env_c.id)
+    assert manager.validate_environment(env_a.id)
+
+
+async def test_periodic_cleanup_task():
+    """Test that the background task removes inactive environments."""
+    manager = SimulationManager()
+    manager.cleanup_interval = 0
+    env = manager.create_environment(SimulationType.TowerOfHanoi, {"N": 3})
+    env.last_accessed -= manager.inactive_threshold + 1
+
+    manager.start_cleanup_task()
+    try:
+        await asyncio.sleep(0.01)
+    finally:
+        await manager.aclose()
+
+    assert not manager.validate_environment(env.id)
+
+
+async def test_cleanup_task_runs_until_last_session_ends():
+    """Test that the cleanup task keeps running while any session is still active."""
+    manager = SimulationManager()
+    manager.start_cleanup_task()
+    manager.start_cleanup_task()
+    cleanup_task = manager._cleanup_task
+
+    await manager.aclose()
+    assert not cleanup_task.done()
+
+    await manager.aclose()
+    assert cleanup_task.cancelled()
+
+
+async def test_cleanup_task_with_two_clients(client):
+    """Test that closing a second client does not stop the cleanup task of the first one."""
+    cleanup_task = mcp_server.simulation_manager._cleanup_task
+    async with Client(mcp_server.mcp) as second_client:
+        await second_client.ping()
+
+    assert mcp_server.simulation_manager._cleanup_task is cleanup_task
+    assert not cleanup_task.done()
+
+
+def test_create_environment_id_collision(monkeypatch):
+    """Test that an ID collision never replaces an existing environment."""
+    env_ids = iter(["same_id", "same_id", "other_id"])
+    monkeypatch.setattr(mcp_server.secrets, "token_urlsafe", lambda nbytes: next(env_ids))
+
+    manager = SimulationManager()
+    first_env = manager.create_environment(SimulationType.TowerOfHanoi, {"N": 3})
+    second_env = manager.create_environment(SimulationType.TowerOfHanoi, {"N": 3})
+
+    assert first_env.id == "same_id"
+    assert second_env.id == "other_id"
+    assert manager.get_environment("same_id") is first_env
@@ -1,18 +1,32 @@
 import pytest
 
-from illusion_of_thinking.simulators import RiverCrossingSimulator
+from illusion_of_thinking.simulators import MAX_CACHED_RIVER_CROSSING_N, RiverCrossingSimulator
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def make_river_crossing():
+    # Simulators are shared by the tests of this module, one per parameter combination.
+    # Every test starts from the initial state.
+    pool = {}
+
     def _make(N=3, k=2):
-        return RiverCrossingSimulator(N=N, k=k)
+        sim = pool.get((N, k))
+        if sim is None:
+            sim = pool[N, k] = RiverCrossingSimulator(N=N, k=k)
+        else:
+            sim.reset()
+        return sim
 
     return _make
 
 
-def test_init_and_reset(make_river_crossing):
-    sim = make_river_crossing()
+@pytest.fixture
+def river_crossing(make_river_crossing):
+    return make_river_crossing()
+
+
+def test_init_and_reset(river_crossing):
+    sim = river_crossing
 
     # Check initial state
     boat_position, entity_positions = sim.state
@@ -31,8 +45,8 @@ def test_init_and_reset(make_river_crossing):
     assert all(pos == 0 for pos in entity_positions.values())
 
 
-def test_is_valid_state(make_river_crossing):
-    sim = make_river_crossing()
+def test_is_valid_state(river_crossing):
+    sim = river_crossing
 
     # Initial state should be valid
     assert sim.is_valid_state()
@@ -55,8 +69,8 @@ def test_is_valid_state(make_river_crossing):
     assert not sim.is_valid_state()
 
 
-def test_valid_move(make_river_crossing):
-    sim = make_river_crossing()
+def test_valid_move(river_crossing):
+    sim = river_crossing
 
     # Valid move: move one agent and its actor
     assert sim.is_valid_move(["a_1", "A_1"])
@@ -80,8 +94,8 @@ def test_valid_move(make_river_crossing):
     assert sim.execute_move(["a_2"])
 
 
-def test_invalid_moves(make_river_crossing):
-    sim = make_river_crossing()
+def test_invalid_moves(river_crossing):
+    sim = river_crossing
 
     # Invalid move: too many passengers
     assert not sim.is_valid_move(["A_1", "a_1", "A_2"])
@@ -105,8 +119,8 @@ def test_invalid_moves(make_river_crossing):
     assert not sim.is_valid_move(["A_1"])
 
 
-def test_constraints(make_river_crossing):
-    sim = make_river_crossing()
+def test_constraints(river_crossing):
+    sim = river_crossing
 
     # Valid move: move one agent and its actor
     assert sim.is_valid_move(["a_1", "A_1"])
@@ -156,8 +170,8 @@ def test_goal_reached():
     assert sim.is_goal_reached()
 
 
-def test_reset_with_valid_and_invalid_state(make_river_crossing):
-    sim = make_river_crossing(N=2, k=2)
+def test_reset_with_valid_and_invalid_state():
+    sim = RiverCrossingSimulator(N=2, k=2)
     # Valid state: all on right bank, boat on right
     valid_state = (1, {"a_1": 1, "A_1": 1, "a_2": 1, "A_2": 1})
     sim.reset(valid_state)
@@ -177,3 +191,84 @@ def test_reset_with_valid_and_invalid_state(make_river_crossing):
         sim.reset(invalid_state)
     # State should remain unchanged (should still be valid_state)
     assert sim.state == valid_state
+
+
+def test_failed_move_keeps_state(river_crossing):
+    sim = river_crossing
+    assert sim.execute_move(["a_1", "A_1"])
+    assert sim.execute_move(["A_1"])
+    state = sim.state
+
+    # Moving a_2 with A_2 puts a_1 with A_2 without A_1, so the move is rolled back
+    assert not sim.execute_move(["a_2", "A_2"])
+    assert sim.state == state
+    assert sim.is_valid_state()
+
+
+def test_execute_move_indices(river_crossing):
+    sim = river_crossing
+
+    # a_1 has index 0 and A_1 has index N = 3
+    assert sim.execute_move_indices([0, 3])
+    assert sim.state == (1, {"a_1": 1, "a_2": 0, "a_3": 0, "A_1": 1, "A_2": 0, "A_3": 0})
+
+    # Passengers which are not at the boat, unknown or duplicated entities are rejected
+    assert not sim.execute_move_indices([1])
+    assert not sim.execute_move_indices([6])
+    assert not sim.execute_move_indices([0, 0])
+    assert sim.execute_move_indices([3])
+
+
+def test_is_valid_state_follows_assigned_states(river_crossing):
+    sim = river_crossing
+    assert sim.is_valid_state()
+
+    boat_position, entity_positions = sim.state
+    sim.state = (2, entity_positions)
+    assert not sim.is_valid_state()
+
+    sim.state = (0, entity_positions)
+    assert sim.is_valid_state()
+
+
+def test_reset_with_unknown_entity(make_river_crossing):
+    sim = make_river_crossing(N=2, k=2)
+    with pytest.raises(ValueError):
+        sim.reset((0, {"a_1": 0, "A_1": 0, "a_2": 0, "a_3": 0}))
+    assert sim.is_valid_state()
+
+
+def test_clone(river_crossing):
+    sim = river_crossing
+    clone = sim.clone()
+
+    # Moves in the clone do not change the original
+    assert clone.execute_move(["a_1", "A_1"])
+    assert clone.state[0] == 1
+    assert sim.state == (0, {"a_1": 0, "a_2": 0, "a_3": 0, "A_1": 0, "A_2": 0, "A_3": 0})
+    assert sim.execute_move(["a_2"])
+    assert clone.state[1]["a_2"] == 0
+
+
+def test_assigned_state_is_copied(river_crossing):
+    sim = river_crossing
+    boat_position, entity_positions = sim.state
+    sim.state = [boat_position, entity_positions]
+    assert sim.state == (boat_position, entity_positions)
+
+    # Neither the assigned nor the returned dictionary is shared with the simulator
+    entity_positions["a_1"] = 1
+    sim.state[1]["A_1"] = 1
+    assert set(sim.state[1].values()) == {0}
+
+    sim.state = (0, {"a_1": 2})
+    assert sim.state == (0, {"a_1": 2})
+    assert not sim.is_valid_state()
+
+
+def test_entities_are_only_shared_for_small_puzzles():
+    N = MAX_CACHED_RIVER_CROSSING_N
+    assert RiverCrossingSimulator(N=N)._idx is RiverCrossingSimulator(N=N)._idx
+    first, second = RiverCrossingSimulator(N=N + 1), RiverCrossingSimulator(N=N + 1)
+    assert first._idx is not second._idx
+    assert first._idx == second._idx
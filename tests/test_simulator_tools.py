@@ -5,6 +5,7 @@ These tests verify that the simulator tools work correctly for both simulator ty
 and handle error cases appropriately.
 """
 
+from types import SimpleNamespace
 from typing import Any, Dict, List
 
 import pytest
@@ -12,32 +13,46 @@ import pytest
 from illusion_of_thinking.constants import SimulationType
 from illusion_of_thinking.simulator_tools import (
     CreateSimulatorTool,
+    ExecuteMovesResult,
     ExecuteMovesTool,
     GetStateTool,
     ResetSimulatorTool,
+    execute_moves_result,
     get_current_simulator,
     set_current_simulator,
 )
 from illusion_of_thinking.simulators import RiverCrossingSimulator, TowerOfHanoiSimulator
 
 
-class TestCreateSimulatorTool:
-    def setup_method(self):
-        # Reset the global simulator before each test
-        set_current_simulator(None)
+@pytest.fixture(autouse=True)
+def _fresh_sim():
+    # Reset the global simulator before each test
+    set_current_simulator(None)
+    yield
+
+
+@pytest.fixture(scope="module")
+def tools() -> SimpleNamespace:
+    # The tools keep no state of their own, so all tests share one instance of each tool
+    return SimpleNamespace(
+        create=CreateSimulatorTool(),
+        reset=ResetSimulatorTool(),
+        get=GetStateTool(),
+        execute=ExecuteMovesTool(),
+    )
+
 
-    def test_create_tower_of_hanoi(self):
-        tool = CreateSimulatorTool()
-        result = tool.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
+class TestCreateSimulatorTool:
+    def test_create_tower_of_hanoi(self, tools):
+        result = tools.create.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
 
         assert "error" not in result
         assert result["simulator_type"] == SimulationType.TowerOfHanoi.name
         assert result["simulator_params"]["N"] == 3
         assert isinstance(get_current_simulator(), TowerOfHanoiSimulator)
 
-    def test_create_river_crossing(self):
-        tool = CreateSimulatorTool()
-        result = tool.forward(simulator_type=SimulationType.RiverCrossing.name, N=2, k=2)
+    def test_create_river_crossing(self, tools):
+        result = tools.create.forward(simulator_type=SimulationType.RiverCrossing.name, N=2, k=2)
 
         assert "error" not in result
         assert result["simulator_type"] == SimulationType.RiverCrossing.name
@@ -45,38 +60,28 @@ class TestCreateSimulatorTool:
         assert result["simulator_params"]["k"] == 2
         assert isinstance(get_current_simulator(), RiverCrossingSimulator)
 
-    def test_create_invalid_simulator_type(self):
-        tool = CreateSimulatorTool()
-        result = tool.forward(simulator_type="InvalidType", N=3)
-
-        assert "error" in result
-        assert get_current_simulator() is None
-
-    def test_create_invalid_N(self):
-        tool = CreateSimulatorTool()
-        result = tool.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=0)
-
-        assert "error" in result
-        assert get_current_simulator() is None
-
-    def test_create_invalid_k(self):
-        tool = CreateSimulatorTool()
-        result = tool.forward(simulator_type=SimulationType.RiverCrossing.name, N=2, k=0)
+    @pytest.mark.parametrize(
+        "simulator_type, N, k",
+        [
+            ("InvalidType", 3, None),
+            (SimulationType.TowerOfHanoi.name, 0, None),
+            (SimulationType.RiverCrossing.name, 2, 0),
+        ],
+    )
+    def test_create_invalid_params(self, tools, simulator_type, N, k):
+        result = tools.create.forward(simulator_type=simulator_type, N=N, k=k)
 
         assert "error" in result
         assert get_current_simulator() is None
 
 
 class TestResetSimulatorTool:
-    def setup_method(self):
-        # Reset the global simulator before each test
-        set_current_simulator(None)
-
+    @pytest.fixture(autouse=True)
+    def _hanoi_sim(self, tools):
         # Create a simulator for testing
-        tool = CreateSimulatorTool()
-        tool.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
+        tools.create.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
 
-    def test_reset_to_default(self):
+    def test_reset_to_default(self, tools):
         current_simulator = get_current_simulator()
 
         # Execute a move to change the state
@@ -84,60 +89,49 @@ class TestResetSimulatorTool:
         assert current_simulator.state != ([3, 2, 1], [], [])
 
         # Reset to default state
-        tool = ResetSimulatorTool()
-        result = tool.forward()
+        result = tools.reset.forward()
 
         assert "error" not in result
         assert result["reset_successful"] is True
         assert current_simulator.state == ([3, 2, 1], [], [])
 
-    def test_reset_to_custom_state(self):
+    def test_reset_to_custom_state(self, tools):
         current_simulator = get_current_simulator()
 
         # Custom state: move the first disk to the third peg
         custom_state = ([3, 2], [], [1])
 
-        tool = ResetSimulatorTool()
-        result = tool.forward(state=custom_state)
+        result = tools.reset.forward(state=custom_state)
 
         assert "error" not in result
         assert result["reset_successful"] is True
         assert current_simulator.state == ([3, 2], [], [1])
 
-    def test_reset_invalid_state(self):
+    def test_reset_invalid_state(self, tools):
         # Invalid state: missing a disk
         invalid_state = ([3, 2], [], [])
 
-        tool = ResetSimulatorTool()
-        result = tool.forward(state=invalid_state)
+        result = tools.reset.forward(state=invalid_state)
 
         assert "error" in result
         assert result["reset_successful"] is False
 
-    def test_reset_no_simulator(self):
+    def test_reset_no_simulator(self, tools):
         # No simulator initialized
         set_current_simulator(None)
 
-        tool = ResetSimulatorTool()
-        result = tool.forward()
+        result = tools.reset.forward()
 
         assert "error" in result
 
 
 class TestGetStateTool:
-    def setup_method(self):
-        # Reset the global simulator before each test
-        global current_simulator
-        current_simulator = None
-
-    def test_get_state_tower_of_hanoi(self):
+    def test_get_state_tower_of_hanoi(self, tools):
         # Create a Tower of Hanoi simulator
-        create_tool = CreateSimulatorTool()
-        create_tool.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
+        tools.create.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
 
         # Get the state
-        tool = GetStateTool()
-        result = tool.forward()
+        result = tools.get.forward()
 
         assert "error" not in result
         assert result["simulator_type"] == SimulationType.TowerOfHanoi.name
@@ -145,14 +139,12 @@ class TestGetStateTool:
         assert result["state"] == ([3, 2, 1], [], [])
         assert result["goal_reached"] is False
 
-    def test_get_state_river_crossing(self):
+    def test_get_state_river_crossing(self, tools):
         # Create a River Crossing simulator
-        create_tool = CreateSimulatorTool()
-        create_tool.forward(simulator_type="RiverCrossing", N=2, k=2)
+        tools.create.forward(simulator_type="RiverCrossing", N=2, k=2)
 
         # Get the state
-        tool = GetStateTool()
-        result = tool.forward()
+        result = tools.get.forward()
 
         assert "error" not in result
         assert result["simulator_type"] == SimulationType.RiverCrossing.name
@@ -160,25 +152,16 @@ class TestGetStateTool:
         assert result["simulator_params"]["k"] == 2
         assert result["goal_reached"] is False
 
-    def test_get_state_no_simulator(self):
-        set_current_simulator(None)
-
-        tool = GetStateTool()
-        result = tool.forward()
+    def test_get_state_no_simulator(self, tools):
+        result = tools.get.forward()
 
         assert "error" in result
 
 
 class TestExecuteMovesTool:
-    def setup_method(self):
-        # Reset the global simulator before each test
-        global current_simulator
-        current_simulator = None
-
-    def test_execute_moves_tower_of_hanoi(self):
+    def test_execute_moves_tower_of_hanoi(self, tools):
         # Create a Tower of Hanoi simulator
-        create_tool = CreateSimulatorTool()
-        create_tool.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
+        tools.create.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
 
         # Define a sequence of moves
         moves = [
@@ -188,8 +171,7 @@ class TestExecuteMovesTool:
         ]
 
         # Execute the moves
-        tool = ExecuteMovesTool()
-        result = tool.forward(moves=moves)
+        result = tools.execute.forward(moves=moves)
 
         assert "error" not in result
         assert result["all_moves_successful"] is True
@@ -197,10 +179,9 @@ class TestExecuteMovesTool:
         assert result["final_state"] == ([3], [2, 1], [])
         assert result["goal_reached"] is False
 
-    def test_execute_invalid_move_tower_of_hanoi(self):
+    def test_execute_invalid_move_tower_of_hanoi(self, tools):
         # Create a Tower of Hanoi simulator
-        create_tool = CreateSimulatorTool()
-        create_tool.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
+        tools.create.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
 
         # Define a sequence of moves with an invalid move
         moves = [
@@ -209,8 +190,7 @@ class TestExecuteMovesTool:
         ]
 
         # Execute the moves
-        tool = ExecuteMovesTool()
-        result = tool.forward(moves=moves)
+        result = tools.execute.forward(moves=moves)
 
         assert "error" not in result
         assert result["all_moves_successful"] is False
@@ -219,10 +199,9 @@ class TestExecuteMovesTool:
         assert result["move_results"][1]["successful"] is False
         assert result["final_state"] == ([3, 2], [], [1])
 
-    def test_execute_moves_river_crossing(self):
+    def test_execute_moves_river_crossing(self, tools):
         # Create a River Crossing simulator
-        create_tool = CreateSimulatorTool()
-        create_tool.forward(simulator_type="RiverCrossing", N=2, k=2)
+        tools.create.forward(simulator_type="RiverCrossing", N=2, k=2)
 
         # Define a sequence of moves
         moves = [
@@ -234,18 +213,16 @@ class TestExecuteMovesTool:
         ]
 
         # Execute the moves
-        tool = ExecuteMovesTool()
-        result = tool.forward(moves=moves)
+        result = tools.execute.forward(moves=moves)
 
         assert "error" not in result
         assert result["all_moves_successful"] is True
         assert len(result["move_results"]) == 5
         assert result["goal_reached"] is True
 
-    def test_execute_invalid_move_river_crossing(self):
+    def test_execute_invalid_move_river_crossing(self, tools):
         # Create a River Crossing simulator
-        create_tool = CreateSimulatorTool()
-        create_tool.forward(simulator_type=SimulationType.RiverCrossing.name, N=2, k=2)
+        tools.create.forward(simulator_type=SimulationType.RiverCrossing.name, N=2, k=2)
 
         # Define a sequence of moves with an invalid move
         moves = [
@@ -256,8 +233,7 @@ class TestExecuteMovesTool:
         ]
 
         # Execute the moves
-        tool = ExecuteMovesTool()
-        result = tool.forward(moves=moves)
+        result = tools.execute.forward(moves=moves)
 
         assert "error" not in result
         assert result["all_moves_successful"] is False
@@ -266,11 +242,60 @@ class TestExecuteMovesTool:
         assert result["move_results"][1]["successful"] is False
         assert result["goal_reached"] is False
 
-    def test_execute_moves_no_simulator(self):
-        # No simulator initialized
-        set_current_simulator(None)
+    def test_execute_moves_does_not_depend_on_earlier_calls(self, tools):
+        tools.create.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
+        assert tools.execute.forward(moves=[[1, 0, 2]])["all_moves_successful"] is True
+        tools.reset.forward()
+
+        # A float disk is rejected, even though an equal int move was executed before
+        result = tools.execute.forward(moves=[[1.0, 0, 2]])
+
+        assert result["all_moves_successful"] is False
+        assert result["final_state"] == ([3, 2, 1], [], [])
+
+    def test_execute_moves_without_move_results(self, tools):
+        tools.create.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=3)
+
+        result = tools.execute.forward(
+            moves=[[1, 0, 2], [2, 0, 1], [3, 0, 1]], return_move_results=False
+        )
+
+        assert result["all_moves_successful"] is False
+        assert result["move_results"] == [{"move_index": 2, "move": [3, 0, 1], "successful": False}]
+        assert result["final_state"] == ([3], [2], [1])
+
+    def test_execute_moves_without_move_results_long_solution(self, tools):
+        tools.create.forward(simulator_type=SimulationType.TowerOfHanoi.name, N=10)
 
-        tool = ExecuteMovesTool()
-        result = tool.forward(moves=[[1, 0, 2]])
+        def solve(n, from_peg, via_peg, to_peg):
+            if n == 0:
+                return []
+            return (
+                solve(n - 1, from_peg, to_peg, via_peg)
+                + [[n, from_peg, to_peg]]
+                + solve(n - 1, via_peg, from_peg, to_peg)
+            )
+
+        moves = solve(10, 0, 1, 2)
+        result = tools.execute.forward(moves=moves, return_move_results=False)
+
+        assert len(moves) == 2**10 - 1
+        assert result["all_moves_successful"] is True
+        assert result["move_results"] == []
+        assert result["goal_reached"] is True
+
+    def test_execute_moves_result(self):
+        simulator = TowerOfHanoiSimulator(N=1)
+
+        result = execute_moves_result(simulator, [[1, 0, 2]])
+
+        assert isinstance(result, ExecuteMovesResult)
+        assert result.all_moves_successful is True
+        assert result.final_state == ([], [], [1])
+        assert result.goal_reached is True
+
+    def test_execute_moves_no_simulator(self, tools):
+        # No simulator initialized
+        result = tools.execute.forward(moves=[[1, 0, 2]])
 
         assert "error" in result